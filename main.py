@@ -5,15 +5,15 @@ Automated management system for Proxmox VE virtual stands.
 """
 
 import sys
-import os
 from modules import shared
 from modules.connections import create_connection, _load_config, test_connection
 from modules.ui_menus import main_menu
+from modules.logger import init_logging
 
 
 def clear_screen():
     """Clear the console screen."""
-    os.system('clear' if os.name == 'posix' else 'cls')
+    shared.console.clear()
 
 
 def print_header():
@@ -111,6 +111,8 @@ def select_connection_menu():
 
 def main():
     """Main entry point."""
+    init_logging()
+    
     # Select connection first
     shared.DEFAULT_CONN = select_connection_menu()
     
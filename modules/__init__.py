@@ -2,73 +2,79 @@
 """
 Lazy Teacher Modules Package.
 All functions are exported for easy access.
+Submodules are imported on first access of an exported name.
 """
 
-# UI Menus
-from .ui_menus import (
-    main_menu, config_menu, connection_menu, user_menu, stand_menu,
-    create_stand_menu, deploy_stand_menu, delete_stand_menu,
-    select_clone_type, select_stand_config, select_user_list,
-    create_stands_menu, manage_stands_menu, stand_config_menu,
-    user_config_menu, create_stand_config_menu
-)
+from importlib import import_module
 
-# Connections
-from .connections import (
-    create_connection, delete_connection, display_connections,
-    test_connection, select_default_connection, get_proxmox_connection
-)
+# Exported name -> submodule that defines it
+_EXPORTS = {
+    # UI Menus
+    'main_menu': 'ui_menus', 'config_menu': 'ui_menus', 'connection_menu': 'ui_menus',
+    'user_menu': 'ui_menus', 'stand_menu': 'ui_menus', 'create_stand_menu': 'ui_menus',
+    'deploy_stand_menu': 'ui_menus', 'delete_stand_menu': 'ui_menus',
+    'select_clone_type': 'ui_menus', 'select_stand_config': 'ui_menus',
+    'select_user_list': 'ui_menus', 'create_stands_menu': 'ui_menus',
+    'manage_stands_menu': 'ui_menus', 'stand_config_menu': 'ui_menus',
+    'user_config_menu': 'ui_menus', 'create_stand_config_menu': 'ui_menus',
+    # Connections
+    'create_connection': 'connections', 'delete_connection': 'connections',
+    'display_connections': 'connections', 'test_connection': 'connections',
+    'select_default_connection': 'connections', 'get_proxmox_connection': 'connections',
+    'get_node_names': 'connections',
+    # Active Users
+    'active_users_menu': 'active_users', 'display_active_users': 'active_users',
+    'select_user': 'active_users',
+    # Stand Management
+    'stand_management_menu': 'stand_management', 'start_all_vms': 'stand_management',
+    'stop_all_vms': 'stand_management', 'reset_all_to_snapshot': 'stand_management',
+    'show_group_status': 'stand_management', 'stop_vm_and_wait': 'stand_management',
+    # Users
+    'input_users_manual': 'users', 'import_users': 'users',
+    'display_user_lists': 'users', 'delete_user_list': 'users',
+    # Stands
+    'add_vm_to_stand': 'stands', 'remove_vm_from_stand': 'stands',
+    'display_stand_vms': 'stands', 'save_stand': 'stands',
+    'delete_stand_file': 'stands', 'display_list_of_stands': 'stands',
+    # Deletion
+    'delete_user_stand': 'deletion', 'delete_user_stand_logic': 'deletion',
+    'delete_all_user_stands': 'deletion',
+    # Tasks
+    'wait_for_clone_task': 'tasks', 'wait_for_template_task': 'tasks',
+    'wait_for_migration_task': 'tasks', 'wait_for_task': 'tasks',
+    # Sync Templates
+    'sync_templates': 'sync_templates', 'get_template_vmid_for_node': 'sync_templates',
+    # Network
+    'reload_network': 'network',
+    # Deploy
+    'deploy_stand_local': 'deploy_stand_local',
+    'deploy_stand_distributed': 'deploy_stand_distributed',
+    # Templates Registry (new)
+    'get_template_registry': 'templates', 'save_template_registry': 'templates',
+    'get_replica_vmid': 'templates', 'get_source_node': 'templates',
+    'register_template': 'templates', 'register_replica': 'templates',
+    'remove_replica': 'templates', 'get_all_nodes_with_template': 'templates',
+    'verify_template_on_node': 'templates', 'ensure_template_on_node': 'templates',
+    # Groups (new)
+    'get_groups': 'groups', 'save_groups': 'groups', 'create_group': 'groups',
+    'get_group': 'groups', 'group_exists': 'groups', 'delete_group': 'groups',
+    'get_group_users': 'groups', 'add_user_to_group': 'groups',
+    'remove_user_from_group': 'groups', 'get_groups_list': 'groups',
+    'get_groups_with_users': 'groups', 'find_user_group': 'groups',
+    'generate_group_name': 'groups',
+}
 
-# Active Users
-from .active_users import active_users_menu, display_active_users, select_user
+__all__ = list(_EXPORTS)
 
-# Stand Management
-from .stand_management import stand_management_menu, start_all_vms, stop_all_vms, reset_all_to_snapshot, show_group_status
 
-# Users
-from .users import (
-    input_users_manual, import_users, display_user_lists, delete_user_list
-)
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
 
-# Stands
-from .stands import (
-    add_vm_to_stand, remove_vm_from_stand, display_stand_vms,
-    save_stand, delete_stand_file, display_list_of_stands
-)
 
-# Deletion
-from .deletion import (
-    delete_user_stand, delete_user_stand_logic, delete_all_user_stands
-)
-
-# Tasks
-from .tasks import (
-    wait_for_clone_task, wait_for_template_task, wait_for_migration_task, wait_for_task
-)
-
-# Sync Templates
-from .sync_templates import sync_templates, get_template_vmid_for_node
-
-# Network
-from .network import reload_network
-
-# Deploy
-from .deploy_stand_local import deploy_stand_local
-from .deploy_stand_distributed import deploy_stand_distributed
-
-# Templates Registry (new)
-from .templates import (
-    get_template_registry, save_template_registry,
-    get_replica_vmid, get_source_node, register_template,
-    register_replica, remove_replica, get_all_nodes_with_template,
-    verify_template_on_node, ensure_template_on_node
-)
-
-# Groups (new)
-from .groups import (
-    get_groups, save_groups, create_group, get_group,
-    group_exists, delete_group, get_group_users,
-    add_user_to_group, remove_user_from_group,
-    get_groups_list, get_groups_with_users,
-    find_user_group, generate_group_name
-)
\ No newline at end of file
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -26,16 +26,13 @@ def get_user_pools(username: str) -> List[Dict[str, Any]]:
     """Get pools for a specific user."""
     try:
         prox = get_proxmox_connection()
-        pools = prox.pools.get()
-        user_pools = []
-        
-        for pool in pools:
-            pool_id = pool.get('poolid', '')
-            if pool_id == username.split('@')[0]:
-                pool_data = prox.pools(pool_id).get()
-                user_pools.append(pool_data)
-        
-        return user_pools
+        pool_name = username.split('@')[0]
+        pool_ids = {pool.get('poolid', '') for pool in prox.pools.get()}
+
+        # Pool ids are unique, so there is at most one pool per user
+        if pool_name not in pool_ids:
+            return []
+        return [prox.pools(pool_name).get()]
     except Exception as e:
         logger.error(f"Error getting pools for {username}: {e}")
         return []
@@ -4,42 +4,93 @@ Connections module for Lazy Teacher.
 Provides functions for managing Proxmox connections.
 """
 
+import hashlib
+import json
+import time
+import weakref
 import yaml
 import proxmoxer
-from pathlib import Path
-from typing import Optional, Dict, Any, Tuple
-import logging
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, Any, List, Tuple
 from . import shared
-from .logger import get_logger, log_operation, log_error, OperationTimer
+from .logger import get_logger, log_error, OperationTimer
 
 logger = get_logger(__name__)
 
+# Parsed proxmox_config.yaml: (mtime_ns, connections)
+_config_cache: Optional[Tuple[int, Dict[str, Any]]] = None
+
+# Connection test error classification: (keywords in lowercased error, message)
+_CONNECTION_ERRORS = (
+    (("timeout", "time"), "Ошибка: Превышено время ожидания подключения"),
+    (("unauthorized", "authentication"), "Ошибка: Неправильные учетные данные"),
+    (("connection", "network"), "Ошибка: Не удается подключиться к серверу"),
+    (("certificate", "ssl"), "Ошибка: Проблема с SSL сертификатом"),
+)
+
+# Successful connection tests are reused for TEST_RESULT_TTL seconds:
+# connection name -> (settings digest, time of the successful test)
+TEST_RESULT_TTL = 5.0
+_test_results: Dict[str, Tuple[str, float]] = {}
+
+# Live API objects per connection name: (connection config, ProxmoxAPI)
+_connection_cache: Dict[str, Tuple[Dict[str, Any], proxmoxer.ProxmoxAPI]] = {}
+
+# Node names per Proxmox connection, dropped together with the connection
+_node_names_cache = weakref.WeakKeyDictionary()
+
 
 def _load_config() -> Dict[str, Any]:
-    """Load connection configuration from file."""
+    """Load connection configuration from file (parsed once per file change)."""
+    global _config_cache
+
     config_file = shared.CONFIG_DIR / 'proxmox_config.yaml'
-    if not config_file.exists():
+    try:
+        mtime = config_file.stat().st_mtime_ns
+    except FileNotFoundError:
         return {}
 
+    if _config_cache is not None and _config_cache[0] == mtime:
+        return dict(_config_cache[1])
+
     try:
         with open(config_file, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f) or {}
-        logger.debug(f"Loaded {len(data)} connections from config file")
-        return data
+            data = yaml.load(f, Loader=shared.YAML_LOADER) or {}
+        _config_cache = (mtime, data)
+        logger.debug("Loaded %s connections from config file", len(data))
+        return dict(data)
     except Exception as e:
         log_error(logger, e, "Load config")
         shared.console.print(f"[!] Ошибка чтения конфигурации: {e}")
         return {}
 
 
+def _config_digest(config_data: Dict[str, Any]) -> str:
+    """Digest of connection settings, so secrets are not kept as cache keys."""
+    serialized = json.dumps(config_data, sort_keys=True, default=str)
+    return hashlib.blake2b(serialized.encode('utf-8'), digest_size=16).hexdigest()
+
+
 def _save_config(config: Dict[str, Any]) -> bool:
     """Save connection configuration to file."""
+    global _config_cache
+
     config_file = shared.CONFIG_DIR / 'proxmox_config.yaml'
+    _config_cache = None
+
+    # Forget test results of connections that were removed or edited
+    for name in [n for n, (digest, _) in _test_results.items()
+                 if n not in config or _config_digest(config[n]) != digest]:
+        del _test_results[name]
+
+    # Release API sessions of connections that were removed or edited
+    for name in [n for n, (cfg, _) in _connection_cache.items() if config.get(n) != cfg]:
+        del _connection_cache[name]
 
     try:
         with open(config_file, 'w', encoding='utf-8') as f:
-            yaml.safe_dump(config, f, default_flow_style=False)
-        logger.debug(f"Saved {len(config)} connections to config file")
+            yaml.dump(config, f, Dumper=shared.YAML_DUMPER, default_flow_style=False)
+        logger.debug("Saved %s connections to config file", len(config))
         return True
     except Exception as e:
         log_error(logger, e, "Save config")
@@ -68,34 +119,43 @@ def _create_proxmox_connection(config_data: Dict[str, Any], timeout: int = 60) -
                 verify_ssl=False,
                 timeout=timeout
             )
+        _enlarge_connection_pool(prox)
         return prox
     except Exception as e:
         error_msg = f"Failed to create Proxmox connection to {config_data.get('host', 'unknown')}:{config_data.get('port', 'unknown')}"
         raise Exception(error_msg) from e
 
 
+def _enlarge_connection_pool(prox: proxmoxer.ProxmoxAPI) -> None:
+    """Size the keep-alive pool of the API session for parallel calls."""
+    session = getattr(prox, '_store', {}).get('session')
+    if session is None:
+        return
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=shared.MAX_WORKERS)
+    session.mount('https://', adapter)
+
+
 def test_connection(config_data: Dict[str, Any], conn_name: str) -> Tuple[bool, str]:
     """Test connection to Proxmox server."""
+    digest = _config_digest(config_data)
+    cached = _test_results.get(conn_name)
+    if cached and cached[0] == digest and time.monotonic() - cached[1] < TEST_RESULT_TTL:
+        return True, "Подключение успешно"
+
     with OperationTimer(logger, f"Test connection {conn_name}"):
         try:
             prox = _create_proxmox_connection(config_data, timeout=10)
             prox.cluster.resources.get()
+            _test_results[conn_name] = (digest, time.monotonic())
             logger.info(f"Connection test successful - conn: {conn_name}")
             return True, "Подключение успешно"
 
         except Exception as e:
             error_msg = str(e).lower()
 
-            if "timeout" in error_msg or "time" in error_msg:
-                message = "Ошибка: Превышено время ожидания подключения"
-            elif "unauthorized" in error_msg or "authentication" in error_msg:
-                message = "Ошибка: Неправильные учетные данные"
-            elif "connection" in error_msg or "network" in error_msg:
-                message = "Ошибка: Не удается подключиться к серверу"
-            elif "certificate" in error_msg or "ssl" in error_msg:
-                message = "Ошибка: Проблема с SSL сертификатом"
-            else:
-                message = f"Ошибка подключения: {str(e)}"
+            message = next((text for keywords, text in _CONNECTION_ERRORS
+                            if any(keyword in error_msg for keyword in keywords)),
+                           f"Ошибка подключения: {str(e)}")
 
             logger.warning(f"Connection test failed: {message}")
             return False, message
@@ -215,7 +275,7 @@ def display_connections():
         
         print("-" * 60)
         input("\nНажмите Enter для продолжения...")
-        logger.debug(f"Displayed {len(connections)} connections")
+        logger.debug("Displayed %s connections", len(connections))
 
 
 def select_default_connection() -> Optional[str]:
@@ -258,19 +318,21 @@ def select_default_connection() -> Optional[str]:
         for i, name in enumerate(available_connections, 1):
             print(f"  [{i}] {name}")
 
-        try:
-            choice = int(input("\nВыберите номер подключения: ")) - 1
+        # Connections are tested once; bad input only repeats the prompt
+        while True:
+            try:
+                choice = int(input("\nВыберите номер подключения: ")) - 1
+            except ValueError:
+                print("[!] Введите число.")
+                continue
+
             if 0 <= choice < len(available_connections):
                 selected = available_connections[choice]
                 print(f"[+] Выбрано активное подключение: {selected}")
                 logger.info(f"Default connection selected - conn: {selected}")
                 return selected
-            else:
-                print("[!] Недопустимый номер.")
-        except ValueError:
-            print("[!] Введите число.")
 
-        return select_default_connection()
+            print("[!] Недопустимый номер.")
 
 
 def get_proxmox_connection(conn_name: Optional[str] = None) -> proxmoxer.ProxmoxAPI:
@@ -290,11 +352,25 @@ def get_proxmox_connection(conn_name: Optional[str] = None) -> proxmoxer.Proxmox
         available = list(config_data.keys())
         raise ValueError(f"Подключение '{conn_name}' не найдено. Доступные: {available}")
 
+    cached = _connection_cache.get(conn_name)
+    if cached and cached[0] == connection_config:
+        return cached[1]
+
     with OperationTimer(logger, f"Get Proxmox connection {conn_name}"):
         try:
             prox = _create_proxmox_connection(connection_config, timeout=60)
+            _connection_cache[conn_name] = (dict(connection_config), prox)
             logger.info(f"Proxmox connection established - conn: {conn_name}")
             return prox
         except Exception as e:
             log_error(logger, e, f"Get Proxmox connection {conn_name}")
-            raise Exception(f"Ошибка подключения к Proxmox API: {e}") from e
\ No newline at end of file
+            raise Exception(f"Ошибка подключения к Proxmox API: {e}") from e
+
+
+def get_node_names(proxmox) -> List[str]:
+    """Get cluster node names, fetched once per connection object."""
+    nodes = _node_names_cache.get(proxmox)
+    if nodes is None:
+        nodes = [n['node'] for n in proxmox.nodes.get()]
+        _node_names_cache[proxmox] = nodes
+    return nodes
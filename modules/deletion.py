@@ -16,22 +16,26 @@ Deletion logic:
 9. Delete user
 """
 
-import glob
+import re
 import yaml
 import time
-from pathlib import Path
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Optional, Dict, Any, Tuple, Set
-import logging
 
 from . import shared
 from .connections import get_proxmox_connection
 from .tasks import wait_for_task as wait_task_func
 from .network import reload_network as reload_net_func
-from .groups import remove_user_from_group, find_user_group, delete_group
+from .users import LIST_SUFFIX, get_user_list_files
+from .groups import remove_user_from_group, find_user_group
 from .logger import get_logger, log_operation, log_error, OperationTimer
 
 logger = get_logger(__name__)
 
+# Bridge name and number from a netX value, e.g. "virtio=..,bridge=vmbr1001,tag=5"
+_BRIDGE_RE = re.compile(r'bridge=(vmbr(\d+))(?:,|$)')
+
 
 def _normalize_user(user: str) -> str:
     """Normalize user format, ensuring @pve domain."""
@@ -42,19 +46,12 @@ def _normalize_user(user: str) -> str:
     return user
 
 
-def _get_user_lists() -> List[Tuple[str, str]]:
-    """Get list of available user list files."""
-    pattern = str(shared.CONFIG_DIR / "*_list.yaml")
-    files = glob.glob(pattern)
-    return [(Path(file).stem.replace('_list', ''), file) for file in files]
-
-
 def _load_user_list(name: str) -> Optional[List[str]]:
     """Load user list from YAML file."""
-    file_path = shared.CONFIG_DIR / f"{name}_list.yaml"
+    file_path = shared.CONFIG_DIR / f"{name}{LIST_SUFFIX}"
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f) or {}
+            data = yaml.load(f, Loader=shared.YAML_LOADER) or {}
         users = data.get('users', [])
         return users if isinstance(users, list) else []
     except FileNotFoundError:
@@ -67,7 +64,7 @@ def _load_user_list(name: str) -> Optional[List[str]]:
 
 def _select_user_list() -> Optional[Tuple[str, str, List[str]]]:
     """Select a user list interactively."""
-    user_lists = _get_user_lists()
+    user_lists = get_user_list_files()
     if not user_lists:
         print("[!] Нет списков пользователей.")
         input("Нажмите Enter для продолжения...")
@@ -135,6 +132,30 @@ def _get_pool_members(prox, pool_name: str) -> Optional[List[Dict[str, Any]]]:
         return None
 
 
+def _fill_member_nodes(prox, members: List[Dict[str, Any]]) -> None:
+    """
+    Make sure every VM member has its node set.
+    Missing nodes are resolved with one cluster-wide VM listing
+    instead of searching every node for every VM.
+    """
+    missing = [m for m in members if m.get('vmid') and not m.get('node')]
+    if not missing:
+        return
+
+    try:
+        vm_nodes = {vm['vmid']: vm['node'] for vm in prox.cluster.resources.get(type='vm')}
+    except Exception as e:
+        logger.warning(f"Failed to resolve nodes for {len(missing)} pool members: {e}")
+        return
+
+    for member in missing:
+        node = vm_nodes.get(member['vmid'])
+        if node:
+            member['node'] = node
+        else:
+            logger.warning(f"VM {member['vmid']} not found in cluster resources")
+
+
 def _check_running_vms(prox, members: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Check which VMs are running and return list of running VMs."""
     running_vms = []
@@ -220,93 +241,139 @@ def _collect_bridges_to_delete(prox, members: List[Dict[str, Any]]) -> Set[Tuple
     Returns set of (bridge_name, node_name) tuples.
     """
     bridges_to_delete = set()
+    targets = [(m.get('vmid'), m.get('node')) for m in members if m.get('vmid') and m.get('node')]
+    if not targets:
+        return bridges_to_delete
 
-    for member in members:
-        vmid = member.get('vmid')
-        member_node = member.get('node')
-        if not vmid or not member_node:
-            continue
+    with ThreadPoolExecutor(max_workers=min(shared.MAX_WORKERS, len(targets))) as executor:
+        futures = {executor.submit(prox.nodes(node).qemu(vmid).config.get): (vmid, node)
+                   for vmid, node in targets}
+
+        for future in as_completed(futures):
+            vmid, member_node = futures[future]
+            try:
+                vm_config = future.result()
+            except Exception as e:
+                logger.warning(f"Failed to check bridges for VM {vmid}: {e}")
+                continue
 
-        try:
-            vm_config = prox.nodes(member_node).qemu(vmid).config.get()
             for key, value in vm_config.items():
-                if key.startswith('net') and 'bridge=' in str(value):
-                    bridge_part = str(value).split('bridge=')[1].split(',')[0]
-                    
-                    # Skip vmbr0
-                    if bridge_part == 'vmbr0':
-                        continue
-                    
-                    # Only collect custom bridges (vmbr1000-1999)
-                    if bridge_part.startswith('vmbr') and bridge_part[4:].isdigit():
-                        num = int(bridge_part[4:])
-                        if 1000 <= num <= 1999:
-                            bridges_to_delete.add((bridge_part, member_node))
-                            logger.debug(f"Collected bridge {bridge_part} on node {member_node} from VM {vmid}")
-        except Exception as e:
-            logger.warning(f"Failed to check bridges for VM {vmid}: {e}")
+                if not key.startswith('net'):
+                    continue
+                match = _BRIDGE_RE.search(str(value))
+                # Only collect custom bridges (vmbr1000-1999), vmbr0 never matches
+                if match and 1000 <= int(match.group(2)) <= 1999:
+                    bridge_name = match.group(1)
+                    bridges_to_delete.add((bridge_name, member_node))
+                    logger.debug("Collected bridge %s on node %s from VM %s", bridge_name, member_node, vmid)
 
     return bridges_to_delete
 
 
+def _delete_bridges_on_node(prox, node: str, bridge_names: List[str]) -> int:
+    """Delete bridges of a single node one by one, return deleted count."""
+    deleted_count = 0
+
+    for bridge_name in bridge_names:
+        try:
+            print(f"  [*] Удаление моста {bridge_name} на ноде {node}...")
+            prox.nodes(node).network.delete(bridge_name)
+            print(f"  [+] Мост {bridge_name} удален с ноды {node}")
+            logger.info(f"Bridge {bridge_name} deleted from node {node}")
+            deleted_count += 1
+        except Exception as e:
+            print(f"  [!] Ошибка удаления моста {bridge_name} на {node}: {e}")
+            log_error(logger, e, f"Delete bridge {bridge_name} on {node}")
+
+    return deleted_count
+
+
 def _delete_bridges(prox, bridges_to_delete: Set[Tuple[str, str]]) -> int:
     """
     Delete network bridges.
+    Bridges are grouped by node; nodes are processed in parallel,
+    bridges of one node sequentially (they share one interfaces file).
     Returns count of successfully deleted bridges.
     """
-    deleted_count = 0
-    
+    by_node = defaultdict(list)
     for bridge_name, bridge_node in bridges_to_delete:
-        try:
-            print(f"  [*] Удаление моста {bridge_name} на ноде {bridge_node}...")
-            prox.nodes(bridge_node).network.delete(bridge_name)
-            print(f"  [+] Мост {bridge_name} удален с ноды {bridge_node}")
-            logger.info(f"Bridge {bridge_name} deleted from node {bridge_node}")
-            deleted_count += 1
-        except Exception as e:
-            print(f"  [!] Ошибка удаления моста {bridge_name} на {bridge_node}: {e}")
-            log_error(logger, e, f"Delete bridge {bridge_name} on {bridge_node}")
-    
+        by_node[bridge_node].append(bridge_name)
+
+    if not by_node:
+        return 0
+
+    deleted_count = 0
+
+    with ThreadPoolExecutor(max_workers=min(shared.MAX_WORKERS, len(by_node))) as executor:
+        futures = {executor.submit(_delete_bridges_on_node, prox, node, sorted(names)): node
+                   for node, names in by_node.items()}
+
+        for future in as_completed(futures):
+            try:
+                deleted_count += future.result()
+            except Exception as e:
+                log_error(logger, e, f"Delete bridges on {futures[future]}")
+
     return deleted_count
 
 
 def _reload_network_on_nodes(prox, nodes: Set[str]) -> None:
-    """Reload network configuration on specified nodes."""
+    """Reload network configuration on specified nodes in parallel."""
+    if not nodes:
+        return
+
     for node_name in nodes:
-        try:
-            print(f"  [*] Обновление сети на ноде {node_name}...")
-            reload_net_func(prox, node_name)
-            print(f"  [+] Сеть на ноде {node_name} обновлена")
-            logger.info(f"Network reloaded on node {node_name}")
-        except Exception as e:
-            print(f"  [!] Ошибка обновления сети на {node_name}: {e}")
-            log_error(logger, e, f"Reload network on {node_name}")
+        print(f"  [*] Обновление сети на ноде {node_name}...")
+
+    with ThreadPoolExecutor(max_workers=min(shared.MAX_WORKERS, len(nodes))) as executor:
+        futures = {executor.submit(reload_net_func, prox, node_name): node_name for node_name in nodes}
+
+        for future in as_completed(futures):
+            node_name = futures[future]
+            try:
+                if future.result():
+                    print(f"  [+] Сеть на ноде {node_name} обновлена")
+                    logger.info(f"Network reloaded on node {node_name}")
+                else:
+                    print(f"  [!] Ошибка обновления сети на {node_name}")
+            except Exception as e:
+                print(f"  [!] Ошибка обновления сети на {node_name}: {e}")
+                log_error(logger, e, f"Reload network on {node_name}")
+
+
+def _delete_vm(prox, vmid: int, node: str) -> bool:
+    """Delete a single VM and wait for the task to finish."""
+    upid = prox.nodes(node).qemu(vmid).delete(purge=1)
+    return wait_task_func(prox, node, upid)
 
 
 def _delete_vms_from_pool(prox, members: List[Dict[str, Any]]) -> List[int]:
-    """Delete VMs from pool and return successfully deleted VMIDs."""
+    """Delete VMs from pool in parallel and return successfully deleted VMIDs."""
+    targets = [(m.get('vmid'), m.get('node')) for m in members if m.get('vmid') and m.get('node')]
+    if not targets:
+        return []
+
+    for vmid, node in targets:
+        print(f"  [*] Удаление VM {vmid} на ноде {node}...")
+
     deleted_vmids = []
 
-    for member in members:
-        vmid = member.get('vmid')
-        node = member.get('node')
-        if not vmid or not node:
-            continue
+    with ThreadPoolExecutor(max_workers=min(shared.MAX_WORKERS, len(targets))) as executor:
+        futures = {executor.submit(_delete_vm, prox, vmid, node): (vmid, node) for vmid, node in targets}
 
-        try:
-            print(f"  [*] Удаление VM {vmid} на ноде {node}...")
-            upid = prox.nodes(node).qemu(vmid).delete(purge=1)
-            
-            if wait_task_func(prox, node, upid):
-                print(f"  [+] VM {vmid} удалена")
-                deleted_vmids.append(vmid)
-                logger.info(f"VM {vmid} deleted from node {node}")
-            else:
-                print(f"  [!] Ошибка удаления VM {vmid}")
-                logger.error(f"Failed to delete VM {vmid} from node {node}")
-        except Exception as e:
-            print(f"  [!] Ошибка удаления VM {vmid}: {e}")
-            log_error(logger, e, f"Delete VM {vmid}")
+        for future in as_completed(futures):
+            vmid, node = futures[future]
+            try:
+                if future.result():
+                    print(f"  [+] VM {vmid} удалена")
+                    deleted_vmids.append(vmid)
+                    logger.info(f"VM {vmid} deleted from node {node}")
+                else:
+                    print(f"  [!] Ошибка удаления VM {vmid}")
+                    logger.error(f"Failed to delete VM {vmid} from node {node}")
+            except Exception as e:
+                print(f"  [!] Ошибка удаления VM {vmid}: {e}")
+                log_error(logger, e, f"Delete VM {vmid}")
 
     return deleted_vmids
 
@@ -426,6 +493,8 @@ def delete_user_stand_logic(prox=None, pool_name: str = None, user: str = None,
         print("[!] Ошибка получения членов пула.")
         return False
 
+    _fill_member_nodes(prox, members)
+
     if not members:
         print("[*] В пуле нет VM. Удаление только пользователя и пула.")
         _delete_pool_and_user(prox, pool_name, user)
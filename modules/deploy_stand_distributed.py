@@ -5,14 +5,11 @@ Deploys stands with even distribution across cluster nodes.
 Uses centralized templates.yaml registry for template management.
 """
 
-import yaml
-from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional
 
-from . import shared
-from .connections import get_proxmox_connection
+from .connections import get_proxmox_connection, get_node_names
 from .sync_templates import sync_templates
-from .logger import get_logger, log_operation, log_error, OperationTimer
+from .logger import get_logger
 
 logger = get_logger(__name__)
 
@@ -54,9 +51,8 @@ def deploy_stand_distributed(stand_config: Dict = None, users_list: List[str] =
         input("Нажмите Enter для продолжения...")
         return None
 
-    nodes_data = prox.nodes.get()
-    nodes = [n['node'] for n in nodes_data]
-    
+    nodes = get_node_names(prox)
+
     if len(nodes) < 2:
         print(f"[!] Кластер содержит только {len(nodes)} ноду. Используйте локальное развертывание.")
         input("Нажмите Enter для продолжения...")
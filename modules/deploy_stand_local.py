@@ -4,22 +4,24 @@ Deploy Stand Local module for Lazy Teacher.
 Deploys stands on a single node with group and template registry integration.
 """
 
+import os
 import random
 import string
-import time
-import yaml
-from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional
 
-from . import shared
-from .connections import get_proxmox_connection
+from proxmoxer.core import ResourceException
+
+from .connections import get_proxmox_connection, get_node_names
 from .network import reload_network as reload_net_func
 from .tasks import wait_for_clone_task, wait_for_snapshot_task
 from .sync_templates import get_template_vmid_for_node
-from .logger import get_logger, log_operation, log_error, OperationTimer
+from .logger import get_logger
 
 logger = get_logger(__name__)
 
+# OUI + fixed byte used for ecorouter interface MAC addresses
+ECOROUTER_MAC_PREFIX = bytes((0x1C, 0x87, 0x76, 0x40))
+
 
 def generate_password() -> str:
     """Generate 8-digit random password."""
@@ -78,29 +80,20 @@ def create_bridges(stand: Dict, proxmox, node: str) -> Dict:
             if bridge.startswith('**'):
                 continue
             
-            if '.' in bridge:
-                alias = bridge.split('.')[0]
-                vlan_id = bridge.split('.')[1]
-                if alias not in bridge_configs:
-                    bridge_configs[alias] = {
-                        'vmbr_name': f"vmbr{bridge_number}",
-                        'vlans': set(),
-                        'has_vlan': True
-                    }
-                    bridge_number += 1
-                else:
-                    # Mark as having VLAN even if initially created without
-                    bridge_configs[alias]['has_vlan'] = True
+            alias, sep, vlan_id = bridge.partition('.')
+            if alias not in bridge_configs:
+                bridge_configs[alias] = {
+                    'vmbr_name': f"vmbr{bridge_number}",
+                    'vlans': set(),
+                    'has_vlan': bool(sep)
+                }
+                bridge_number += 1
+            elif sep:
+                # Mark as having VLAN even if initially created without
+                bridge_configs[alias]['has_vlan'] = True
+            
+            if sep:
                 bridge_configs[alias]['vlans'].add(int(vlan_id))
-            else:
-                alias = bridge
-                if alias not in bridge_configs:
-                    bridge_configs[alias] = {
-                        'vmbr_name': f"vmbr{bridge_number}",
-                        'vlans': set(),
-                        'has_vlan': False
-                    }
-                    bridge_number += 1
 
     for alias, config in bridge_configs.items():
         try:
@@ -109,27 +102,31 @@ def create_bridges(stand: Dict, proxmox, node: str) -> Dict:
                 'type': 'bridge',
                 'autostart': 1
             }
-            proxmox.nodes(node).network.post(**bridge_params)
             
             # Enable vlan_aware if any network uses VLAN for this alias
             # This allows both tagged and untagged traffic on the same bridge
             if config['has_vlan']:
-                try:
-                    proxmox.nodes(node).network(config['vmbr_name']).put(
-                        type='bridge',
-                        bridge_vlan_aware=1
-                    )
-                    logger.info(f"Enabled VLAN-aware for {config['vmbr_name']} (alias: {alias})")
-                except Exception as e:
-                    logger.error(f"Failed to enable VLAN-aware for {config['vmbr_name']}: {e}")
-                    
+                bridge_params['bridge_vlan_aware'] = 1
+            
+            proxmox.nodes(node).network.post(**bridge_params)
+            
+            if config['has_vlan']:
+                logger.info(f"Enabled VLAN-aware for {config['vmbr_name']} (alias: {alias})")
             logger.info(f"Created bridge {config['vmbr_name']} on {node}")
         except Exception as e:
-            logger.error(f"Error creating bridge {config['vmbr_name']}: {e}")
+            if config['has_vlan']:
+                logger.error(f"Failed to create VLAN-aware bridge {config['vmbr_name']} (alias: {alias}): {e}")
+            else:
+                logger.error(f"Error creating bridge {config['vmbr_name']}: {e}")
 
     return bridge_configs
 
 
+def _already_exists(error: ResourceException) -> bool:
+    """Check if Proxmox rejected a create request because the object exists."""
+    return error.status_code == 500 and 'already exists' in str(error.content)
+
+
 def create_user(proxmox, username: str, password: str) -> bool:
     """Create Proxmox user."""
     try:
@@ -138,13 +135,15 @@ def create_user(proxmox, username: str, password: str) -> bool:
             password=password,
         )
         return True
-    except Exception as e:
-        error_msg = str(e).lower()
-        if "already exists" in error_msg:
+    except ResourceException as e:
+        if _already_exists(e):
             logger.info(f"User {username} already exists")
             return True
         logger.error(f"Error creating user {username}: {e}")
         return False
+    except Exception as e:
+        logger.error(f"Error creating user {username}: {e}")
+        return False
 
 
 def create_pool(proxmox, pool_name: str) -> bool:
@@ -152,13 +151,15 @@ def create_pool(proxmox, pool_name: str) -> bool:
     try:
         proxmox.pools.post(poolid=pool_name)
         return True
-    except Exception as e:
-        error_msg = str(e).lower()
-        if "already exists" in error_msg:
+    except ResourceException as e:
+        if _already_exists(e):
             logger.info(f"Pool {pool_name} already exists")
             return True
         logger.error(f"Error creating pool {pool_name}: {e}")
         return False
+    except Exception as e:
+        logger.error(f"Error creating pool {pool_name}: {e}")
+        return False
 
 
 def assign_pool_permissions(proxmox, pool_name: str, username: str) -> bool:
@@ -175,6 +176,23 @@ def assign_pool_permissions(proxmox, pool_name: str, username: str) -> bool:
         return False
 
 
+def _provision_user(proxmox, username: str, password: str, pool_name: str) -> bool:
+    """Create user and pool and grant the user access to the pool."""
+    if not create_user(proxmox, username, password):
+        print(f"  [!] Ошибка создания пользователя {username}")
+        return False
+
+    if not create_pool(proxmox, pool_name):
+        print(f"  [!] Ошибка создания пула {pool_name}")
+        return False
+
+    if not assign_pool_permissions(proxmox, pool_name, username):
+        print(f"  [!] Ошибка назначения прав на пул {pool_name}")
+        return False
+
+    return True
+
+
 def clone_vm(proxmox, node: str, template_vmid: int, new_vmid: int, 
              vm_name: str, full_clone: int, pool_name: str) -> Optional[str]:
     """Clone VM from template."""
@@ -202,70 +220,57 @@ def configure_vm_network(proxmox, node: str, vmid: int, networks: List,
     For linux devices:
         - net0+ = interfaces from configuration
     """
-    import secrets
-    
     net_configs = {}
 
     if device_type == 'ecorouter':
-        # Generate MAC address for ecorouter (1C:87:76:40:XX:XX)
-        mac = [0x1C, 0x87, 0x76, 0x40]
-        mac.extend(secrets.randbelow(256) for _ in range(2))
-        mac_addr = ':'.join(f'{b:02x}' for b in mac)
+        model, first_index = 'vmxnet3', 1
+        # Random tail for every interface (net0 included) drawn in one call,
+        # MAC format is 1C:87:76:40:XX:XX
+        rand = os.urandom(2 * (len(networks) + 1))
+        macs = [(ECOROUTER_MAC_PREFIX + rand[i:i + 2]).hex(':') for i in range(0, len(rand), 2)]
         
         # net0 = vmbr0 + link_down (management port)
-        net_configs['net0'] = f"model=vmxnet3,bridge=vmbr0,macaddr={mac_addr},link_down=1"
-        
-        # net1+ = interfaces from configuration
-        for i, network in enumerate(networks, start=1):
-            bridge = network['bridge']
-            net_key = f"net{i}"
-            
-            # Generate unique MAC for each interface
-            mac = [0x1C, 0x87, 0x76, 0x40]
-            mac.extend(secrets.randbelow(256) for _ in range(2))
-            mac_addr = ':'.join(f'{b:02x}' for b in mac)
-            
-            if bridge.startswith('**'):
-                # Static bridge (e.g., **vmbr0)
-                bridge_name = bridge.strip('*')
-                net_config = f"model=vmxnet3,bridge={bridge_name},macaddr={mac_addr}"
-            else:
-                alias = bridge.split('.')[0]
-                vmbr_name = bridge_configs[alias]['vmbr_name']
-                
-                if '.' in bridge:
-                    vlan_id = bridge.split('.')[1]
-                    net_config = f"model=vmxnet3,bridge={vmbr_name},tag={vlan_id},macaddr={mac_addr}"
-                else:
-                    net_config = f"model=vmxnet3,bridge={vmbr_name},macaddr={mac_addr}"
-            
-            net_configs[net_key] = net_config
+        net_configs['net0'] = f"model={model},bridge=vmbr0,macaddr={macs[0]},link_down=1"
     else:
         # Linux devices - standard configuration
-        for i, network in enumerate(networks):
-            bridge = network['bridge']
-            net_key = f"net{i}"
+        model, first_index = 'virtio', 0
+        macs = None
 
-            if bridge.startswith('**'):
-                bridge_name = bridge.strip('*')
-                net_config = f"model=virtio,bridge={bridge_name}"
-            else:
-                alias = bridge.split('.')[0]
-                vmbr_name = bridge_configs[alias]['vmbr_name']
+    for i, network in enumerate(networks, start=first_index):
+        bridge = network['bridge']
 
-                if '.' in bridge:
-                    vlan_id = bridge.split('.')[1]
-                    net_config = f"model=virtio,bridge={vmbr_name},tag={vlan_id}"
-                else:
-                    net_config = f"model=virtio,bridge={vmbr_name}"
+        if bridge.startswith('**'):
+            # Static bridge (e.g., **vmbr0)
+            bridge_name = bridge.strip('*')
+            net_config = f"model={model},bridge={bridge_name}"
+        else:
+            alias, sep, vlan_id = bridge.partition('.')
+            vmbr_name = bridge_configs[alias]['vmbr_name']
+            net_config = f"model={model},bridge={vmbr_name}"
 
-            net_configs[net_key] = net_config
+            if sep:
+                net_config += f",tag={vlan_id}"
 
-    for net_key, net_config in net_configs.items():
-        try:
-            proxmox.nodes(node).qemu(vmid).config.put(**{net_key: net_config})
-        except Exception as e:
-            logger.error(f"Error configuring {net_key} for VM {vmid}: {e}")
+        if macs:
+            net_config += f",macaddr={macs[i]}"
+
+        net_configs[f"net{i}"] = net_config
+
+    if not net_configs:
+        return
+
+    vm_config = proxmox.nodes(node).qemu(vmid).config
+    try:
+        # All interfaces in one request
+        vm_config.put(**net_configs)
+    except Exception as e:
+        logger.error(f"Error configuring networks for VM {vmid}: {e}")
+        # Retry one by one to apply what is valid and isolate the bad interface
+        for net_key, net_config in net_configs.items():
+            try:
+                vm_config.put(**{net_key: net_config})
+            except Exception as e:
+                logger.error(f"Error configuring {net_key} for VM {vmid}: {e}")
 
 
 def assign_vm_permissions(proxmox, vmid: int, username: str) -> bool:
@@ -324,10 +329,10 @@ def deploy_stand_local(stand_config: Dict = None, users_list: List[str] = None,
         input("Нажмите Enter для продолжения...")
         return []
 
-    nodes_data = prox.nodes.get()
-    nodes = [n['node'] for n in nodes_data]
+    nodes = get_node_names(prox)
+    node_set = frozenset(nodes)
     
-    if target_node and target_node in nodes:
+    if target_node and target_node in node_set:
         node = target_node
     else:
         if stand.get('machines'):
@@ -335,7 +340,7 @@ def deploy_stand_local(stand_config: Dict = None, users_list: List[str] = None,
         else:
             node = nodes[0]
         
-        if node not in nodes:
+        if node not in node_set:
             node = nodes[0]
 
     deployment_results = []
@@ -350,19 +355,8 @@ def deploy_stand_local(stand_config: Dict = None, users_list: List[str] = None,
         # Create unique bridges for this user
         user_bridge_configs = create_bridges(stand, prox, node)
 
-        # Create user
-        if not create_user(prox, username, password):
-            print(f"  [!] Ошибка создания пользователя {username}")
-            continue
-
-        # Create pool
-        if not create_pool(prox, pool_name):
-            print(f"  [!] Ошибка создания пула {pool_name}")
-            continue
-
-        # Assign pool permissions
-        if not assign_pool_permissions(prox, pool_name, username):
-            print(f"  [!] Ошибка назначения прав на пул {pool_name}")
+        # Create user and pool, assign pool permissions
+        if not _provision_user(prox, username, password, pool_name):
             continue
 
         # Deploy VMs
@@ -7,16 +7,42 @@ Groups are created during deployment and stored in config/groups.yaml
 
 import yaml
 from pathlib import Path
-from typing import Dict, Optional, Any, List
+from typing import Dict, Optional, Any, List, Tuple
 from datetime import datetime
-import logging
 from . import shared
-from .logger import get_logger, log_operation, log_error, OperationTimer
+from .logger import get_logger, log_operation, log_error
 
 logger = get_logger(__name__)
 
 GROUPS_FILE = shared.CONFIG_DIR / 'groups.yaml'
 
+# (groups.yaml mtime_ns, {username: group_name}) - inverted index for find_user_group
+_user_index: Optional[Tuple[int, Dict[str, str]]] = None
+
+
+def _get_user_index() -> Dict[str, str]:
+    """
+    Get username -> group name index.
+    
+    The index is built with a single pass over all groups and rebuilt
+    only when groups.yaml changes on disk.
+    
+    Returns:
+        Dictionary mapping usernames to the first group containing them
+    """
+    global _user_index
+    
+    mtime = shared.file_mtime(GROUPS_FILE)
+    if _user_index is None or _user_index[0] != mtime:
+        index = {}
+        for group_name, group_data in get_groups().items():
+            for username in group_data.get('users', []):
+                index.setdefault(username, group_name)
+        _user_index = (mtime, index)
+        logger.debug("Built user index for %s users", len(index))
+    
+    return _user_index[1]
+
 
 def get_groups() -> Dict[str, Any]:
     """
@@ -34,13 +60,13 @@ def get_groups() -> Dict[str, Any]:
         }
     """
     if not GROUPS_FILE.exists():
-        logger.debug(f"Groups file {GROUPS_FILE} not found, returning empty dict")
+        logger.debug("Groups file %s not found, returning empty dict", GROUPS_FILE)
         return {}
     
     try:
         with open(GROUPS_FILE, 'r', encoding='utf-8') as f:
             data = yaml.safe_load(f) or {}
-        logger.debug(f"Loaded {len(data)} groups")
+        logger.debug("Loaded %s groups", len(data))
         return data
     except Exception as e:
         log_error(logger, e, "Load groups", file=str(GROUPS_FILE))
@@ -51,16 +77,27 @@ def save_groups(groups: Dict[str, Any]) -> bool:
     """
     Save groups to groups.yaml.
     
+    The file is replaced atomically and only if its content changes
+    (see shared.atomic_write_if_changed).
+    
     Args:
         groups: Groups dictionary
         
     Returns:
         True if saved successfully, False otherwise
     """
+    global _user_index
+    
+    # Force index rebuild even if mtime resolution hides the write
+    _user_index = None
+    
     try:
-        with open(GROUPS_FILE, 'w', encoding='utf-8') as f:
-            yaml.safe_dump(groups, f, default_flow_style=False, allow_unicode=True)
-        logger.debug(f"Saved {len(groups)} groups")
+        payload = yaml.safe_dump(groups, default_flow_style=False, allow_unicode=True).encode('utf-8')
+        
+        if shared.atomic_write_if_changed(GROUPS_FILE, payload):
+            logger.debug("Saved %s groups", len(groups))
+        else:
+            logger.debug("Groups unchanged, skipping write")
         return True
     except Exception as e:
         log_error(logger, e, "Save groups", file=str(GROUPS_FILE))
@@ -187,7 +224,7 @@ def add_user_to_group(group_name: str, username: str) -> bool:
         logger.info(f"Added user '{username}' to group '{group_name}'")
         return save_groups(groups)
     
-    logger.debug(f"User '{username}' already in group '{group_name}'")
+    logger.debug("User '%s' already in group '%s'", username, group_name)
     return True
 
 
@@ -219,7 +256,7 @@ def remove_user_from_group(group_name: str, username: str) -> bool:
         
         return save_groups(groups)
     
-    logger.debug(f"User '{username}' not in group '{group_name}'")
+    logger.debug("User '%s' not in group '%s'", username, group_name)
     return True
 
 
@@ -255,13 +292,7 @@ def find_user_group(username: str) -> Optional[str]:
     Returns:
         Group name if found, None otherwise
     """
-    groups = get_groups()
-    
-    for group_name, group_data in groups.items():
-        if username in group_data.get('users', []):
-            return group_name
-    
-    return None
+    return _get_user_index().get(username)
 
 
 def generate_group_name(stand_config: str, user_list: str) -> str:
@@ -4,45 +4,82 @@ Logger module for Lazy Teacher.
 Provides logging utilities without rich dependency.
 """
 
+import os
+import queue
+import atexit
 import logging
+import logging.handlers
 import time
-from functools import wraps
-from typing import Optional, Dict, Any
-from datetime import datetime
+from functools import wraps, lru_cache
+from typing import Optional
 
 
-# Setup basic logging
-logging.basicConfig(
-    filename='lazy_teacher.log',
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+LOG_FILE = 'lazy_teacher.log'
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+DEFAULT_LOG_LEVEL = 'INFO'
 
+_listener: Optional[logging.handlers.QueueListener] = None
 
+
+def init_logging(log_file: str = LOG_FILE, level: Optional[str] = None) -> None:
+    """
+    Configure application logging. Repeated calls are no-ops.
+    
+    Loggers only put records on a queue; a background QueueListener
+    writes them to the log file, so callers never wait on disk I/O.
+    Level defaults to INFO and can be overridden with LT_LOG_LEVEL.
+    """
+    global _listener
+    
+    if _listener is not None:
+        return
+    
+    level_name = (level or os.environ.get('LT_LOG_LEVEL') or DEFAULT_LOG_LEVEL).upper()
+    
+    file_handler = logging.FileHandler(log_file, encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, level_name, logging.INFO))
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    
+    _listener = logging.handlers.QueueListener(log_queue, file_handler,
+                                               respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+@lru_cache(maxsize=256)
 def get_logger(name: str = __name__) -> logging.Logger:
-    """Get a logger instance."""
+    """Get a logger instance (cached per name)."""
     return logging.getLogger(name)
 
 
 def log_operation(logger: logging.Logger, operation: str, success: bool = True, **kwargs) -> None:
     """Log an operation with optional context."""
+    level = logging.INFO if success else logging.WARNING
+    # Skip building the context string for records that would be dropped
+    if not logger.isEnabledFor(level):
+        return
+
     status = "SUCCESS" if success else "FAILED"
-    context = " | ".join(f"{k}={v}" for k, v in kwargs.items())
     message = f"[{operation}] {status}"
-    if context:
-        message += f" | {context}"
-    
-    if success:
-        logger.info(message)
-    else:
-        logger.warning(message)
+    if kwargs:
+        message += " | " + " | ".join(f"{k}={v}" for k, v in kwargs.items())
+    logger.log(level, message)
 
 
-def log_error(logger: logging.Logger, error: Exception, context: str = None) -> None:
+def log_error(logger: logging.Logger, error: Exception, context: str = None, **kwargs) -> None:
     """Log an error with context."""
+    if not logger.isEnabledFor(logging.ERROR):
+        return
+
     message = f"ERROR: {type(error).__name__}: {error}"
     if context:
         message = f"[{context}] {message}"
+    if kwargs:
+        message += " | " + " | ".join(f"{k}={v}" for k, v in kwargs.items())
     logger.error(message, exc_info=True)
 
 
@@ -56,11 +93,15 @@ class OperationTimer:
         self.start_time = None
     
     def __enter__(self):
-        self.start_time = time.time()
+        self.start_time = time.perf_counter()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        elapsed = time.time() - self.start_time
+        elapsed = time.perf_counter() - self.start_time
+        level = logging.DEBUG if exc_type is None else logging.ERROR
+        if not self.logger.isEnabledFor(level):
+            return False
+
         context = " | ".join(f"{k}={v}" for k, v in self.kwargs.items())
         
         if exc_type is None:
@@ -86,14 +127,14 @@ def timed(logger: logging.Logger = None):
             if logger is None:
                 logger = get_logger(func.__module__)
             
-            start_time = time.time()
+            start_time = time.perf_counter()
             try:
                 result = func(*args, **kwargs)
-                elapsed = time.time() - start_time
-                logger.debug(f"[{func.__name__}] completed in {elapsed:.2f}s")
+                elapsed = time.perf_counter() - start_time
+                logger.debug("[%s] completed in %.2fs", func.__name__, elapsed)
                 return result
             except Exception as e:
-                elapsed = time.time() - start_time
+                elapsed = time.perf_counter() - start_time
                 logger.error(f"[{func.__name__}] failed after {elapsed:.2f}s: {e}")
                 raise
         return wrapper
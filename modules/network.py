@@ -5,10 +5,10 @@ Provides optimized functions for network management and synchronization.
 """
 
 import time
-import logging
 from typing import Any, Optional, Dict
 
 from . import shared
+from .tasks import wait_for_task
 from .logger import get_logger, log_operation, log_error, OperationTimer
 
 logger = get_logger(__name__)
@@ -37,15 +37,16 @@ def reload_network(proxmox: Any, node: str, timeout: int = 30) -> bool:
             # Execute network reload
             result = proxmox.nodes(node).network.put()
 
-            # Wait for operation to settle (brief pause for network reconfiguration)
-            time.sleep(2)
+            # Reload runs as a node task - wait for it to finish instead of a fixed pause
+            if isinstance(result, str) and result.startswith('UPID:'):
+                wait_for_task(proxmox, node, result, "network reload", timeout, 0.5)
 
             elapsed = time.time() - start_time
             logger.info(f"Network reload completed on node '{node}' in {elapsed:.1f}s")
 
             # Log result details if available
             if result:
-                logger.debug(f"Network reload result: {result}")
+                logger.debug("Network reload result: %s", result)
 
             log_operation(logger, "Network reload successful",
                          success=True, node=node, duration=elapsed)
@@ -84,7 +85,7 @@ def get_node_network_status(proxmox: Any, node: str) -> Optional[Dict[str, Any]]
     with OperationTimer(logger, f"Get network status for {node}"):
         try:
             network_config = proxmox.nodes(node).network.get()
-            logger.debug(f"Retrieved network config for node {node}: {len(network_config.get('data', []))} interfaces")
+            logger.debug("Retrieved network config for node %s: %s interfaces", node, len(network_config.get('data', [])))
             return network_config
         except Exception as e:
             log_error(logger, e, f"Get network status for {node}")
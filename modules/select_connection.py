@@ -5,7 +5,6 @@ Provides optimized functions for connection selection.
 """
 
 import yaml
-from pathlib import Path
 from typing import Optional, Dict, Any
 
 from . import shared
@@ -99,7 +98,7 @@ def get_available_connections() -> Dict[str, Dict[str, Any]]:
         if config_file.exists():
             with open(config_file, 'r', encoding='utf-8') as f:
                 data = yaml.safe_load(f) or {}
-            logger.debug(f"Loaded {len(data)} connections from config")
+            logger.debug("Loaded %s connections from config", len(data))
             return data
         else:
             logger.debug("Connection config file does not exist")
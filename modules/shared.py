@@ -4,23 +4,19 @@ Shared imports and constants for Lazy Teacher.
 """
 
 import os
+import re
 import sys
 import yaml
+import hashlib
+import tempfile
 import logging
 import warnings
-import time
 from pathlib import Path
-import proxmoxer
-from functools import wraps
+from typing import Dict, List, Tuple
 
 warnings.filterwarnings("ignore", message=".*Unverified HTTPS request.*")
 
-# Setup logger
-logging.basicConfig(
-    filename='lazy_teacher.log',
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Logging is configured by logger.init_logging() at application start
 logger = logging.getLogger(__name__)
 
 # Constants
@@ -33,59 +29,142 @@ VLAN_SEPARATOR = '.'
 STATIC_PREFIX = '**'
 BACK_OPTION = '0'
 
+# Upper bound for concurrent Proxmox API calls
+MAX_WORKERS = 16
+
+# libyaml-backed (C) YAML loader/dumper, pure Python fallback if unavailable
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
 DEFAULT_CONN = None
 
+# path -> (content digest, mtime_ns) of the last write made by atomic_write_if_changed
+_last_written: Dict[Path, Tuple[bytes, int]] = {}
+
+# Screen clearing: ANSI escapes everywhere except the classic Windows console
+ANSI_CLEAR = '\033[2J\033[3J\033[H'
+_USE_ANSI_CLEAR = os.name != 'nt'
+
+# Console markup: [tag]content[/tag]
+_MARKUP_RE = re.compile(r'\[(\w+)\](.*?)\[/\1\]')
+MARKUP_COLORS = {
+    'red': '\033[91m',
+    'green': '\033[92m',
+    'yellow': '\033[93m',
+    'blue': '\033[94m',
+    'magenta': '\033[95m',
+    'cyan': '\033[96m',
+    'white': '\033[97m',
+    'bold': '\033[1m',
+    'reset': '\033[0m'
+}
+
+
+def file_mtime(path: Path) -> int:
+    """Return mtime of a file in nanoseconds, 0 if file is missing."""
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+def list_config_files(suffix: str) -> List[Tuple[str, str]]:
+    """List (name, path) of CONFIG_DIR files named <name><suffix> in one scandir pass."""
+    with os.scandir(CONFIG_DIR) as it:
+        return [(entry.name[:-len(suffix)], entry.path) for entry in it
+                if entry.name.endswith(suffix) and entry.is_file()]
+
+
+def _file_has_content(path: Path, data: bytes) -> bool:
+    """Check whether a file holds exactly the given bytes."""
+    try:
+        return path.stat().st_size == len(data) and path.read_bytes() == data
+    except OSError:
+        return False
+
+
+def atomic_write_if_changed(path: Path, data: bytes) -> bool:
+    """
+    Replace a file atomically and durably unless it already holds data.
+    
+    The data goes to a uniquely named temp file in the same directory, which
+    is fsynced and then moved over the file with os.replace. The write is
+    skipped if the file is unchanged since our last write of the same content,
+    or its bytes match. Returns True if the file was written.
+    """
+    path = Path(path)
+    digest = hashlib.blake2b(data, digest_size=16).digest()
+    
+    mtime = file_mtime(path)
+    if _last_written.get(path) == (digest, mtime) or _file_has_content(path, data):
+        _last_written[path] = (digest, mtime)
+        return False
+    
+    tmp = tempfile.NamedTemporaryFile(dir=path.parent, prefix=f"{path.name}.", suffix='.tmp',
+                                      delete=False)
+    try:
+        with tmp:
+            tmp.write(data)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.replace(tmp.name, path)
+    finally:
+        # Only left behind if the write or the replace failed
+        if os.path.exists(tmp.name):
+            os.unlink(tmp.name)
+    _last_written[path] = (digest, file_mtime(path))
+    return True
+
 
 class SimpleConsole:
     """Simple console replacement without rich dependency."""
-    
+
+    def __init__(self):
+        # Colors and screen control only make sense on a terminal;
+        # piped output gets plain text
+        self.is_terminal = sys.stdout.isatty()
+        self.color = self.is_terminal
+
     def print(self, *args, **kwargs):
         """Print with basic color support using ANSI codes."""
         message = ' '.join(str(arg) for arg in args)
         
         # Parse basic markup like [red]text[/red]
-        message = self._parse_markup(message)
+        if '[' in message:
+            message = self._parse_markup(message)
         
         print(message, **kwargs)
     
     def _parse_markup(self, text: str) -> str:
         """Convert simple markup to ANSI codes."""
-        colors = {
-            'red': '\033[91m',
-            'green': '\033[92m',
-            'yellow': '\033[93m',
-            'blue': '\033[94m',
-            'magenta': '\033[95m',
-            'cyan': '\033[96m',
-            'white': '\033[97m',
-            'bold': '\033[1m',
-            'reset': '\033[0m'
-        }
-        
-        import re
-        
-        # Find all [tag]content[/tag] patterns
-        pattern = r'\[(\w+)\](.*?)\[/\1\]'
-        
+        if '[' not in text:
+            return text
+
         def replace_tag(match):
             tag = match.group(1)
             content = match.group(2)
-            if tag in colors:
-                return f"{colors[tag]}{content}{colors['reset']}"
+            if self.color and tag in MARKUP_COLORS:
+                return f"{MARKUP_COLORS[tag]}{content}{MARKUP_COLORS['reset']}"
             return content
         
-        # Handle nested tags by applying repeatedly
-        for _ in range(5):  # Max nesting depth
-            new_text = re.sub(pattern, replace_tag, text)
-            if new_text == text:
+        # Handle nested tags by applying until nothing is left to replace
+        while True:
+            text, count = _MARKUP_RE.subn(replace_tag, text)
+            if not count:
                 break
-            text = new_text
         
         return text
     
     def clear(self):
         """Clear console screen."""
-        os.system('clear' if os.name == 'posix' else 'cls')
+        if not self.is_terminal:
+            return
+        if _USE_ANSI_CLEAR:
+            # Erase screen and scrollback, cursor home - no /bin/clear process per redraw
+            sys.stdout.write(ANSI_CLEAR)
+            sys.stdout.flush()
+        else:
+            os.system('cls')
     
     def status(self, message: str, spinner: str = None):
         """Simple status context manager (no spinner, just prints)."""
@@ -4,19 +4,24 @@ Stand Management module for Lazy Teacher.
 Provides functions for managing existing stands.
 """
 
-import time
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from typing import List, Dict, Any, Optional, Tuple, Callable
 
 from . import shared
 from .connections import get_proxmox_connection
-from .groups import get_groups, get_group, get_group_users
+from .groups import get_groups, get_group
+from .tasks import wait_for_task
 from .logger import get_logger, log_operation, log_error, OperationTimer
 
 logger = get_logger(__name__)
 
+# Seconds Proxmox may take to stop a VM before the stop task fails
+STOP_TIMEOUT = 30
 
-def _select_group() -> Optional[str]:
-    """Select a group from available groups."""
+
+def _select_group() -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Select a group from available groups, return (name, group data)."""
     groups = get_groups()
     
     if not groups:
@@ -38,7 +43,8 @@ def _select_group() -> Optional[str]:
         if choice == 0:
             return None
         if 1 <= choice <= len(group_names):
-            return group_names[choice - 1]
+            name = group_names[choice - 1]
+            return name, groups[name]
         print("[!] Неверный выбор.")
         return None
     except ValueError:
@@ -56,15 +62,116 @@ def _get_pool_members(prox, pool_name: str) -> List[Dict[str, Any]]:
         return []
 
 
+def _get_vm_status_map(prox) -> Dict[int, Dict[str, Any]]:
+    """Get status of all cluster VMs with one request, indexed by VMID."""
+    try:
+        return {vm['vmid']: vm for vm in prox.cluster.resources.get(type='vm')}
+    except Exception as e:
+        log_error(logger, e, "Get cluster VM status")
+        return {}
+
+
+def _get_vm_status(status_map: Dict[int, Dict[str, Any]], vmid: int, vm) -> str:
+    """Get VM status from the cluster map, querying the VM resource only if it is missing."""
+    info = status_map.get(vmid)
+    if info is None:
+        info = vm.status.current.get()
+    return info.get('status', 'unknown')
+
+
+def _collect_group_vms(prox, users: List[str]) -> List[Tuple[int, str]]:
+    """Collect (vmid, node) of all VMs in the pools of the given users."""
+    targets = []
+    for user in users:
+        pool_name = user.split('@')[0]
+        for member in _get_pool_members(prox, pool_name):
+            vmid = member.get('vmid')
+            node = member.get('node')
+            if vmid and node:
+                targets.append((vmid, node))
+    return targets
+
+
+def _needs_action(targets: List[Tuple[int, str]], status_map: Dict[int, Dict[str, Any]],
+                  running: bool) -> List[Tuple[int, str]]:
+    """
+    Drop VMs the cluster map already shows as running (running=True)
+    or as not running (running=False). VMs missing from the map are kept.
+    """
+    return [(vmid, node) for vmid, node in targets
+            if vmid not in status_map or (status_map[vmid].get('status') == 'running') != running]
+
+
+def _run_vm_actions(action: Callable[[int, str], bool], targets: List[Tuple[int, str]],
+                    action_name: str) -> int:
+    """Run action(vmid, node) for all VMs in parallel, return number of VMs it changed."""
+    if not targets:
+        return 0
+
+    changed = 0
+    with ThreadPoolExecutor(max_workers=min(shared.MAX_WORKERS, len(targets))) as executor:
+        futures = {executor.submit(action, vmid, node): vmid for vmid, node in targets}
+
+        for future in as_completed(futures):
+            vmid = futures[future]
+            try:
+                if future.result():
+                    changed += 1
+            except Exception as e:
+                log_error(logger, e, f"{action_name} VM {vmid}")
+
+    return changed
+
+
+def stop_vm_and_wait(prox, node: str, vm) -> None:
+    """Stop VM (bound qemu resource) and wait for the stop task.
+
+    Proxmox itself waits up to STOP_TIMEOUT for the VM to shut down.
+    """
+    upid = vm.status.stop.post(timeout=STOP_TIMEOUT)
+    wait_for_task(prox, node, upid, "stop", STOP_TIMEOUT * 2)
+
+
+def _start_vm(prox, vmid: int, node: str) -> bool:
+    """Start VM; callers pass only VMs _needs_action kept as not running."""
+    prox.nodes(node).qemu(vmid).status.start.post()
+    print(f"  [+] VM {vmid} запущена")
+    return True
+
+
+def _stop_vm(prox, vmid: int, node: str) -> bool:
+    """Stop VM; callers pass only VMs _needs_action kept as running."""
+    prox.nodes(node).qemu(vmid).status.stop.post()
+    print(f"  [+] VM {vmid} остановлена")
+    return True
+
+
+def _reset_vm(prox, status_map: Dict[int, Dict[str, Any]], snapshot_name: str,
+              vmid: int, node: str) -> bool:
+    """Stop VM unless the cluster map shows it as not running, then roll it back to the snapshot."""
+    vm = prox.nodes(node).qemu(vmid)
+
+    info = status_map.get(vmid)
+    if info is None or info.get('status') == 'running':
+        stop_vm_and_wait(prox, node, vm)
+
+    # Rollback to snapshot
+    vm.snapshot(snapshot_name).rollback.post()
+    print(f"  [+] VM {vmid} сброшена на '{snapshot_name}'")
+    return True
+
+
 def start_all_vms(group_name: str = None) -> bool:
     """Start all VMs in a group."""
     with OperationTimer(logger, "Start all VMs"):
         if group_name is None:
-            group_name = _select_group()
-            if not group_name:
+            selection = _select_group()
+            if not selection:
                 return False
+            group_name, group = selection
+        else:
+            group = get_group(group_name)
         
-        group = get_group(group_name)
         if not group:
             print(f"[!] Группа {group_name} не найдена.")
             return False
@@ -81,25 +188,10 @@ def start_all_vms(group_name: str = None) -> bool:
             return False
         
         print(f"\n[*] Запуск всех VM группы {group_name}...")
+        status_map = _get_vm_status_map(prox)
         
-        started_count = 0
-        for user in users:
-            pool_name = user.split('@')[0]
-            members = _get_pool_members(prox, pool_name)
-            
-            for member in members:
-                vmid = member.get('vmid')
-                node = member.get('node')
-                
-                if vmid and node:
-                    try:
-                        vm_status = prox.nodes(node).qemu(vmid).status.current.get()
-                        if vm_status.get('status') != 'running':
-                            prox.nodes(node).qemu(vmid).status.start.post()
-                            print(f"  [+] VM {vmid} запущена")
-                            started_count += 1
-                    except Exception as e:
-                        log_error(logger, e, f"Start VM {vmid}")
+        targets = _needs_action(_collect_group_vms(prox, users), status_map, running=True)
+        started_count = _run_vm_actions(partial(_start_vm, prox), targets, "Start")
         
         print(f"\n[+] Запущено {started_count} VM")
         log_operation(logger, "Start all VMs", success=True, 
@@ -111,11 +203,13 @@ def stop_all_vms(group_name: str = None) -> bool:
     """Stop all VMs in a group."""
     with OperationTimer(logger, "Stop all VMs"):
         if group_name is None:
-            group_name = _select_group()
-            if not group_name:
+            selection = _select_group()
+            if not selection:
                 return False
+            group_name, group = selection
+        else:
+            group = get_group(group_name)
         
-        group = get_group(group_name)
         if not group:
             print(f"[!] Группа {group_name} не найдена.")
             return False
@@ -132,25 +226,10 @@ def stop_all_vms(group_name: str = None) -> bool:
             return False
         
         print(f"\n[*] Остановка всех VM группы {group_name}...")
+        status_map = _get_vm_status_map(prox)
         
-        stopped_count = 0
-        for user in users:
-            pool_name = user.split('@')[0]
-            members = _get_pool_members(prox, pool_name)
-            
-            for member in members:
-                vmid = member.get('vmid')
-                node = member.get('node')
-                
-                if vmid and node:
-                    try:
-                        vm_status = prox.nodes(node).qemu(vmid).status.current.get()
-                        if vm_status.get('status') == 'running':
-                            prox.nodes(node).qemu(vmid).status.stop.post()
-                            print(f"  [+] VM {vmid} остановлена")
-                            stopped_count += 1
-                    except Exception as e:
-                        log_error(logger, e, f"Stop VM {vmid}")
+        targets = _needs_action(_collect_group_vms(prox, users), status_map, running=False)
+        stopped_count = _run_vm_actions(partial(_stop_vm, prox), targets, "Stop")
         
         print(f"\n[+] Остановлено {stopped_count} VM")
         log_operation(logger, "Stop all VMs", success=True,
@@ -162,11 +241,13 @@ def reset_all_to_snapshot(group_name: str = None, snapshot_name: str = "start")
     """Reset all VMs in a group to a snapshot."""
     with OperationTimer(logger, "Reset all to snapshot"):
         if group_name is None:
-            group_name = _select_group()
-            if not group_name:
+            selection = _select_group()
+            if not selection:
                 return False
+            group_name, group = selection
+        else:
+            group = get_group(group_name)
         
-        group = get_group(group_name)
         if not group:
             print(f"[!] Группа {group_name} не найдена.")
             return False
@@ -183,37 +264,11 @@ def reset_all_to_snapshot(group_name: str = None, snapshot_name: str = "start")
             return False
         
         print(f"\n[*] Сброс всех VM группы {group_name} на snapshot '{snapshot_name}'...")
+        status_map = _get_vm_status_map(prox)
         
-        reset_count = 0
-        for user in users:
-            pool_name = user.split('@')[0]
-            members = _get_pool_members(prox, pool_name)
-            
-            for member in members:
-                vmid = member.get('vmid')
-                node = member.get('node')
-                
-                if vmid and node:
-                    try:
-                        # Stop if running
-                        vm_status = prox.nodes(node).qemu(vmid).status.current.get()
-                        if vm_status.get('status') == 'running':
-                            prox.nodes(node).qemu(vmid).status.stop.post()
-                            
-                            # Wait for stop
-                            for _ in range(30):
-                                status = prox.nodes(node).qemu(vmid).status.current.get()
-                                if status.get('status') == 'stopped':
-                                    break
-                                time.sleep(1)
-                        
-                        # Rollback to snapshot
-                        prox.nodes(node).qemu(vmid).snapshot(snapshot_name).rollback.post()
-                        print(f"  [+] VM {vmid} сброшена на '{snapshot_name}'")
-                        reset_count += 1
-                        
-                    except Exception as e:
-                        log_error(logger, e, f"Reset VM {vmid}")
+        targets = _collect_group_vms(prox, users)
+        reset_count = _run_vm_actions(partial(_reset_vm, prox, status_map, snapshot_name),
+                                      targets, "Reset")
         
         print(f"\n[+] Сброшено {reset_count} VM")
         log_operation(logger, "Reset all to snapshot", success=True,
@@ -225,11 +280,13 @@ def show_group_status(group_name: str = None) -> None:
     """Show status of all VMs in a group."""
     with OperationTimer(logger, "Show group status"):
         if group_name is None:
-            group_name = _select_group()
-            if not group_name:
+            selection = _select_group()
+            if not selection:
                 return
+            group_name, group = selection
+        else:
+            group = get_group(group_name)
         
-        group = get_group(group_name)
         if not group:
             print(f"[!] Группа {group_name} не найдена.")
             return
@@ -245,10 +302,15 @@ def show_group_status(group_name: str = None) -> None:
             print(f"[!] {e}")
             return
         
-        print(f"\nСтатус VM группы {group_name}:")
-        print("-" * 60)
-        print(f"{'Пользователь':<20} {'VMID':<8} {'Имя':<20} {'Статус':<10}")
-        print("-" * 60)
+        status_map = _get_vm_status_map(prox)
+
+        # Build the whole table first and emit it with a single print
+        lines = [
+            f"\nСтатус VM группы {group_name}:",
+            "-" * 60,
+            f"{'Пользователь':<20} {'VMID':<8} {'Имя':<20} {'Статус':<10}",
+            "-" * 60,
+        ]
         
         for user in users:
             pool_name = user.split('@')[0]
@@ -261,14 +323,16 @@ def show_group_status(group_name: str = None) -> None:
                 
                 if vmid and node:
                     try:
-                        vm_status = prox.nodes(node).qemu(vmid).status.current.get()
-                        status = vm_status.get('status', 'unknown')
-                        status_display = '\033[92mrunning\033[0m' if status == 'running' else '\033[91mstopped\033[0m'
-                        print(f"{pool_name:<20} {vmid:<8} {vm_name:<20} {status_display}")
-                    except Exception as e:
-                        print(f"{pool_name:<20} {vmid:<8} {vm_name:<20} \033[93merror\033[0m")
+                        vm = prox.nodes(node).qemu(vmid)
+                        status = _get_vm_status(status_map, vmid, vm)
+                        status_display = '[green]running[/green]' if status == 'running' else '[red]stopped[/red]'
+                    except Exception:
+                        status_display = '[yellow]error[/yellow]'
+                    lines.append(f"{pool_name:<20} {vmid:<8} {vm_name:<20} {status_display}")
         
-        print("-" * 60)
+        lines.append("-" * 60)
+        # Console markup turns into colors on a terminal and plain text when piped
+        shared.console.print("\n".join(lines))
         input("\nНажмите Enter для продолжения...")
 
 
@@ -4,23 +4,151 @@ Stands module for Lazy Teacher.
 Provides functions for managing stand configurations.
 """
 
-import glob
+import os
+import sys
+import copy
 import yaml
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from typing import Dict, List, Optional, Any, Tuple
 
 from . import shared
-from .connections import get_proxmox_connection
-from .logger import get_logger, log_operation, log_error, OperationTimer
+from .connections import get_proxmox_connection, get_node_names
+from .logger import get_logger, log_error, OperationTimer
 
 logger = get_logger(__name__)
 
+STAND_SUFFIX = '_stand.yaml'
+
+# Fields shown per machine by display_stand_vms (all present in saved stands)
+_machine_fields = itemgetter('name', 'template_vmid', 'template_node', 'device_type', 'networks')
+
+# (CONFIG_DIR mtime_ns, [(name, path), ...]) from the last directory scan
+_stand_files_cache: Optional[Tuple[int, List[Tuple[str, str]]]] = None
+
+# path -> ((mtime_ns, size), parsed stand) for stand files read so far
+_stand_cache: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+
+# path -> ((mtime_ns, size), (machine count, bridge count)) for the stand list
+_summary_cache: Dict[str, Tuple[Tuple[int, int], Tuple[int, int]]] = {}
+
+
+def _stat_key(path: str) -> Tuple[int, int]:
+    """Return (mtime_ns, size) of a file, used to validate cached parses."""
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _read_stand_file(path: str) -> Dict[str, Any]:
+    """
+    Parse a stand file, reusing the previous result while its mtime and size are unchanged.
+    
+    The returned dict is shared with the cache and must not be modified.
+    """
+    key = _stat_key(path)
+    cached = _stand_cache.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    
+    with open(path, 'rb') as f:
+        data = yaml.load(f.read(), Loader=shared.YAML_LOADER) or {}
+    _stand_cache[path] = (key, data)
+    return data
+
+
+def _node_get(node: yaml.Node, key: str) -> Optional[yaml.Node]:
+    """Return the value node for a scalar key of a mapping node."""
+    if isinstance(node, yaml.MappingNode):
+        for key_node, value_node in node.value:
+            if isinstance(key_node, yaml.ScalarNode) and key_node.value == key:
+                return value_node
+    return None
+
+
+def _summarize_stand(path: str) -> Tuple[int, int]:
+    """
+    Return (machine count, unique bridge count) of a stand file.
+    
+    Uses the parsed stand when it is cached, otherwise walks the composed
+    node graph without building the Python objects for the whole document.
+    """
+    key = _stat_key(path)
+    cached = _stand_cache.get(path)
+    if cached is not None and cached[0] == key:
+        data = cached[1]
+        machines = data.get('machines') or ()
+        networks = {n.get('bridge', '')
+                    for m in machines
+                    for n in m.get('networks') or ()}
+        return len(machines), len(networks)
+    
+    cached = _summary_cache.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    
+    with open(path, 'rb') as f:
+        root = yaml.compose(f.read(), Loader=shared.YAML_LOADER)
+    
+    machines = _node_get(root, 'machines') if root is not None else None
+    machine_nodes = machines.value if isinstance(machines, yaml.SequenceNode) else []
+    networks = set()
+    for m in machine_nodes:
+        nets = _node_get(m, 'networks')
+        if not isinstance(nets, yaml.SequenceNode):
+            continue
+        for n in nets.value:
+            bridge = _node_get(n, 'bridge')
+            networks.add(bridge.value if isinstance(bridge, yaml.ScalarNode) else '')
+    
+    summary = (len(machine_nodes), len(networks))
+    _summary_cache[path] = (key, summary)
+    return summary
+
+
+def _try_summarize_stand(path: str) -> Optional[Tuple[int, int]]:
+    """Summarize a stand file, None if it cannot be read or parsed."""
+    try:
+        return _summarize_stand(path)
+    except Exception as e:
+        logger.warning("Failed to read stand file %s: %s", path, e)
+        return None
+
 
 def _get_stand_files() -> List[Tuple[str, str]]:
-    """Get list of stand configuration files."""
-    pattern = str(shared.CONFIG_DIR / "*_stand.yaml")
-    files = glob.glob(pattern)
-    return [(Path(f).stem.replace('_stand', ''), f) for f in files]
+    """
+    Get list of stand configuration files.
+    
+    The directory listing is cached until the mtime of CONFIG_DIR changes,
+    i.e. until a file is created, removed or renamed there.
+    """
+    global _stand_files_cache
+    
+    try:
+        dir_mtime = os.stat(shared.CONFIG_DIR).st_mtime_ns
+    except OSError as e:
+        logger.warning(f"Failed to stat config dir {shared.CONFIG_DIR}: {e}")
+        return []
+    
+    if _stand_files_cache is None or _stand_files_cache[0] != dir_mtime:
+        _stand_files_cache = (dir_mtime, shared.list_config_files(STAND_SUFFIX))
+    
+    return list(_stand_files_cache[1])
+
+
+def _prompt_int(prompt: str, lo: int, hi: int) -> Optional[int]:
+    """Ask for a number in [lo, hi]; None for empty, non-numeric or out-of-range input."""
+    answer = input(prompt).strip()
+    if not answer:
+        return None
+    try:
+        value = int(answer)
+    except ValueError:
+        print("[!] Введите число.")
+        return None
+    if not lo <= value <= hi:
+        print("[!] Неверный выбор.")
+        return None
+    return value
 
 
 def display_list_of_stands() -> None:
@@ -33,26 +161,20 @@ def display_list_of_stands() -> None:
             input("\nНажмите Enter для продолжения...")
             return
         
-        print("\nКонфигурации стендов:")
-        print("-" * 60)
-        print(f"{'№':<5} {'Имя':<25} {'Машин':<10} {'Сетей':<10}")
-        print("-" * 60)
+        # Summarize all files up front, overlapping their I/O
+        with ThreadPoolExecutor(max_workers=min(shared.MAX_WORKERS, len(stand_files))) as executor:
+            summaries = list(executor.map(_try_summarize_stand, (path for _, path in stand_files)))
         
-        for i, (name, file_path) in enumerate(stand_files, 1):
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = yaml.safe_load(f) or {}
-                machines = data.get('machines', [])
-                networks = set()
-                for m in machines:
-                    for n in m.get('networks', []):
-                        networks.add(n.get('bridge', ''))
-                
-                print(f"{i:<5} {name:<25} {len(machines):<10} {len(networks):<10}")
-            except Exception as e:
-                print(f"{i:<5} {name:<25} {'Ошибка':<10}")
+        row = "{:<5} {:<25} {:<10} {:<10}".format
+        lines = ["\nКонфигурации стендов:", "-" * 60, row('№', 'Имя', 'Машин', 'Сетей'), "-" * 60]
+        for i, ((name, _), summary) in enumerate(zip(stand_files, summaries), 1):
+            if summary is None:
+                lines.append(row(i, name, 'Ошибка', ''))
+            else:
+                lines.append(row(i, name, *summary))
+        lines.append("-" * 60)
+        sys.stdout.write("\n".join(lines) + "\n")
         
-        print("-" * 60)
         input("\nНажмите Enter для продолжения...")
 
 
@@ -64,21 +186,22 @@ def display_stand_vms(stand: Dict[str, Any]) -> None:
         print("[!] В конфигурации нет машин.")
         return
     
-    print("\nМашины в конфигурации:")
-    print("-" * 80)
-    print(f"{'№':<5} {'Имя':<20} {'Template':<12} {'Node':<15} {'Тип':<12} {'Сетей':<8}")
-    print("-" * 80)
-    
+    row = "{:<5} {:<20} {:<12} {:<15} {:<12} {:<8}".format
+    lines = ["\nМашины в конфигурации:", "-" * 80,
+             row('№', 'Имя', 'Template', 'Node', 'Тип', 'Сетей'), "-" * 80]
     for i, machine in enumerate(machines, 1):
-        name = machine.get('name', 'N/A')
-        template = machine.get('template_vmid', 'N/A')
-        node = machine.get('template_node', 'N/A')
-        device_type = machine.get('device_type', 'linux')
-        networks = len(machine.get('networks', []))
-        
-        print(f"{i:<5} {name:<20} {str(template):<12} {node:<15} {device_type:<12} {networks:<8}")
+        try:
+            name, template, node, device_type, networks = _machine_fields(machine)
+        except KeyError:
+            name = machine.get('name', 'N/A')
+            template = machine.get('template_vmid', 'N/A')
+            node = machine.get('template_node', 'N/A')
+            device_type = machine.get('device_type', 'linux')
+            networks = machine.get('networks', [])
+        lines.append(row(i, name, str(template), node, device_type, len(networks)))
     
-    print("-" * 80)
+    lines.append("-" * 80)
+    sys.stdout.write("\n".join(lines) + "\n")
     input("\nНажмите Enter для продолжения...")
 
 
@@ -92,22 +215,15 @@ def add_vm_to_stand(stand: Dict[str, Any], conn_name: str = None) -> None:
             return
         
         # Get available nodes
-        nodes_data = prox.nodes.get()
-        nodes = [n['node'] for n in nodes_data]
+        nodes = get_node_names(prox)
         
         print("\nДоступные ноды:")
-        for i, node in enumerate(nodes, 1):
-            print(f"  [{i}] {node}")
+        print("\n".join(f"  [{i}] {node}" for i, node in enumerate(nodes, 1)))
         
-        try:
-            node_choice = int(input("Выберите ноду: ")) - 1
-            if not (0 <= node_choice < len(nodes)):
-                print("[!] Неверный выбор.")
-                return
-            selected_node = nodes[node_choice]
-        except ValueError:
-            print("[!] Введите число.")
+        node_choice = _prompt_int("Выберите ноду: ", 1, len(nodes))
+        if node_choice is None:
             return
+        selected_node = nodes[node_choice - 1]
         
         # Get VMs on selected node
         vms = prox.nodes(selected_node).qemu.get()
@@ -117,25 +233,16 @@ def add_vm_to_stand(stand: Dict[str, Any], conn_name: str = None) -> None:
             print("[!] На ноде нет шаблонов.")
             return
         
-        print(f"\nШаблоны на ноде {selected_node}:")
-        print("-" * 60)
-        print(f"{'№':<5} {'VMID':<10} {'Имя':<40}")
-        print("-" * 60)
-        
-        for i, vm in enumerate(templates, 1):
-            print(f"{i:<5} {vm['vmid']:<10} {vm.get('name', 'N/A'):<40}")
+        row = "{:<5} {:<10} {:<40}".format
+        lines = [f"\nШаблоны на ноде {selected_node}:", "-" * 60, row('№', 'VMID', 'Имя'), "-" * 60]
+        lines.extend(row(i, vm['vmid'], vm.get('name', 'N/A')) for i, vm in enumerate(templates, 1))
+        lines.append("")
+        print("\n".join(lines))
         
-        print()
-        
-        try:
-            template_choice = int(input("Выберите шаблон: ")) - 1
-            if not (0 <= template_choice < len(templates)):
-                print("[!] Неверный выбор.")
-                return
-            selected_template = templates[template_choice]
-        except ValueError:
-            print("[!] Введите число.")
+        template_choice = _prompt_int("Выберите шаблон: ", 1, len(templates))
+        if template_choice is None:
             return
+        selected_template = templates[template_choice - 1]
         
         vm_name = input("Имя VM (оставьте пустым для имени шаблона): ").strip()
         if not vm_name:
@@ -170,7 +277,7 @@ def add_vm_to_stand(stand: Dict[str, Any], conn_name: str = None) -> None:
         
         stand.setdefault('machines', []).append(machine)
         print(f"\n[+] Машина '{vm_name}' добавлена в конфигурацию (тип: {device_type})")
-        logger.info(f"Added VM {vm_name} to stand config (type: {device_type})")
+        logger.info("Added VM %s to stand config (type: %s)", vm_name, device_type)
 
 
 def remove_vm_from_stand(stand: Dict[str, Any]) -> None:
@@ -182,33 +289,39 @@ def remove_vm_from_stand(stand: Dict[str, Any]) -> None:
         return
     
     print("\nМашины в конфигурации:")
-    for i, machine in enumerate(machines, 1):
-        print(f"  [{i}] {machine.get('name', 'N/A')}")
+    print("\n".join(f"  [{i}] {machine.get('name', 'N/A')}" for i, machine in enumerate(machines, 1)))
     print(f"  [0] Отмена")
     
-    try:
-        choice = int(input("Выберите машину для удаления: "))
-        if choice == 0:
-            return
-        if 1 <= choice <= len(machines):
-            removed = machines.pop(choice - 1)
-            print(f"\n[+] Машина '{removed.get('name')}' удалена")
-            logger.info(f"Removed VM {removed.get('name')} from stand config")
-        else:
-            print("[!] Неверный выбор.")
-    except ValueError:
-        print("[!] Введите число.")
+    choice = _prompt_int("Выберите машину для удаления: ", 0, len(machines))
+    if not choice:
+        return
+
+    removed = machines.pop(choice - 1)
+    print(f"\n[+] Машина '{removed.get('name')}' удалена")
+    logger.info("Removed VM %s from stand config", removed.get('name'))
 
 
 def save_stand(stand_name: str, stand: Dict[str, Any]) -> bool:
-    """Save stand configuration to file."""
-    file_path = shared.CONFIG_DIR / f"{stand_name}_stand.yaml"
+    """
+    Save stand configuration to file.
+    
+    The file is replaced atomically and only if its content changes
+    (see shared.atomic_write_if_changed).
+    """
+    file_path = shared.CONFIG_DIR / f"{stand_name}{STAND_SUFFIX}"
     
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            yaml.safe_dump(stand, f, default_flow_style=False, allow_unicode=True)
+        payload = yaml.dump(stand, Dumper=shared.YAML_DUMPER, default_flow_style=False,
+                            allow_unicode=True, sort_keys=False, encoding='utf-8')
+        
+        if shared.atomic_write_if_changed(file_path, payload):
+            _stand_cache.pop(str(file_path), None)
+            _summary_cache.pop(str(file_path), None)
+        else:
+            logger.debug("Stand config %s unchanged, skipping write", stand_name)
+        
         print(f"\n[+] Конфигурация '{stand_name}' сохранена")
-        logger.info(f"Saved stand config: {stand_name}")
+        logger.info("Saved stand config: %s", stand_name)
         return True
     except Exception as e:
         print(f"[!] Ошибка сохранения: {e}")
@@ -218,11 +331,13 @@ def save_stand(stand_name: str, stand: Dict[str, Any]) -> bool:
 
 def load_stand(stand_name: str) -> Optional[Dict[str, Any]]:
     """Load stand configuration from file."""
-    file_path = shared.CONFIG_DIR / f"{stand_name}_stand.yaml"
+    file_path = str(shared.CONFIG_DIR / f"{stand_name}{STAND_SUFFIX}")
+    if not os.path.isfile(file_path):
+        logger.warning("Stand config %s not found", stand_name)
+        return None
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f) or {}
+        return copy.deepcopy(_read_stand_file(file_path))
     except FileNotFoundError:
         logger.warning(f"Stand config {stand_name} not found")
         return None
@@ -243,27 +358,23 @@ def delete_stand_file() -> None:
     print("\nУдаление конфигурации стенда:")
     print("-" * 50)
     
-    for i, (name, _) in enumerate(stand_files, 1):
-        print(f"  [{i}] {name}")
+    print("\n".join(f"  [{i}] {name}" for i, (name, _) in enumerate(stand_files, 1)))
     print(f"  [0] Отмена")
     print()
     
-    try:
-        choice = int(input("Выберите конфигурацию: "))
-        if choice == 0:
-            return
-        if 1 <= choice <= len(stand_files):
-            name, file_path = stand_files[choice - 1]
-            
-            confirm = input(f"Удалить конфигурацию '{name}'? (y/n): ").strip().lower()
-            if confirm == 'y':
-                Path(file_path).unlink()
-                print(f"\n[+] Конфигурация '{name}' удалена")
-                logger.info(f"Deleted stand config: {name}")
-        else:
-            print("[!] Неверный выбор.")
-    except ValueError:
-        print("[!] Введите число.")
+    choice = _prompt_int("Выберите конфигурацию: ", 0, len(stand_files))
+    if choice == 0:
+        return
+    if choice is not None:
+        name, file_path = stand_files[choice - 1]
+        
+        confirm = input(f"Удалить конфигурацию '{name}'? (y/n): ").strip().lower()
+        if confirm == 'y':
+            os.unlink(file_path)
+            _stand_cache.pop(file_path, None)
+            _summary_cache.pop(file_path, None)
+            print(f"\n[+] Конфигурация '{name}' удалена")
+            logger.info("Deleted stand config: %s", name)
     
     input("\nНажмите Enter для продолжения...")
 
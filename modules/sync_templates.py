@@ -5,19 +5,16 @@ Provides optimized functions for template synchronization across Proxmox nodes.
 Now uses centralized templates.yaml registry instead of stand config files.
 """
 
-import string
-import random
-from typing import Dict, List, Optional, Any, Set
-import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Any, Set, Tuple
 
 from . import shared
 from .templates import (
-    get_template_registry, get_replica_vmid, get_source_node,
-    register_template, register_replica, verify_template_on_node,
-    ensure_template_on_node
+    get_template_registry, get_replica_vmid,
+    register_template, verify_template_on_node,
+    ensure_template_on_node, registry_batch, in_registry_batch
 )
-from .tasks import wait_for_clone_task, wait_for_template_task, wait_for_migration_task
-from .logger import get_logger, log_operation, log_error, OperationTimer
+from .logger import get_logger, log_error, OperationTimer
 
 logger = get_logger(__name__)
 console = shared.console
@@ -35,7 +32,8 @@ def get_unique_templates(stand: Dict[str, Any]) -> Dict[int, Dict[str, Any]]:
         {
             100: {
                 'source_node': 'pve1',
-                'machines': ['gw', 'srv']  # Machine names using this template
+                'machines': ['gw', 'srv'],  # Machine names using this template
+                'configs': [{...}, {...}]   # Their machine dicts from the stand
             }
         }
     """
@@ -46,22 +44,24 @@ def get_unique_templates(stand: Dict[str, Any]) -> Dict[int, Dict[str, Any]]:
         template_node = machine.get('template_node')
         
         if template_vmid is None:
-            logger.warning(f"Machine {machine.get('name', 'unknown')} missing template_vmid")
+            logger.warning("Machine %s missing template_vmid", machine.get('name', 'unknown'))
             continue
             
-        if template_vmid not in templates:
-            templates[template_vmid] = {
+        info = templates.get(template_vmid)
+        if info is None:
+            info = templates[template_vmid] = {
                 'source_node': template_node,
-                'machines': []
+                'machines': [],
+                'configs': []
             }
+        elif not info['source_node']:
+            # Update source node if not set
+            info['source_node'] = template_node
         
-        templates[template_vmid]['machines'].append(machine.get('name', 'unknown'))
-        
-        # Update source node if not set
-        if not templates[template_vmid]['source_node']:
-            templates[template_vmid]['source_node'] = template_node
+        info['machines'].append(machine.get('name', 'unknown'))
+        info['configs'].append(machine)
     
-    logger.debug(f"Found {len(templates)} unique templates in stand")
+    logger.debug("Found %s unique templates in stand", len(templates))
     return templates
 
 
@@ -88,7 +88,7 @@ def sync_templates(prox, stand: Dict[str, Any], nodes: List[str]) -> bool:
         return False
 
     with OperationTimer(logger, "Sync templates across nodes"):
-        logger.info(f"Starting template synchronization for {len(nodes)} nodes")
+        logger.info("Starting template synchronization for %s nodes", len(nodes))
         
         # Get unique templates from stand
         templates = get_unique_templates(stand)
@@ -97,52 +97,122 @@ def sync_templates(prox, stand: Dict[str, Any], nodes: List[str]) -> bool:
             return False
         
         updated = False
+        pending = []
+        node_templates = _get_node_templates(prox, nodes)
         
-        # Process each template
-        for template_vmid, template_info in templates.items():
-            source_node = template_info['source_node']
-            machine_names = template_info['machines']
-            
-            if not source_node:
-                logger.error(f"Template {template_vmid} has no source node")
-                continue
-            
-            logger.info(f"Processing template {template_vmid} (source: {source_node}, used by: {machine_names})")
-            
-            # Register template in global registry if not exists
-            register_template(template_vmid, source_node)
-            
-            # Sync to each target node
-            for target_node in nodes:
-                if target_node == source_node:
+        with registry_batch():
+            # Process each template
+            for template_vmid, template_info in templates.items():
+                source_node = template_info['source_node']
+                machine_names = template_info['machines']
+                
+                if not source_node:
+                    logger.error("Template %s has no source node", template_vmid)
                     continue
                 
-                # Check if replica already exists in registry and is valid
-                replica_vmid = get_replica_vmid(template_vmid, target_node)
+                logger.info("Processing template %s (source: %s, used by: %s)", template_vmid, source_node, machine_names)
                 
-                if replica_vmid and verify_template_on_node(prox, target_node, replica_vmid):
-                    logger.debug(f"Template {template_vmid} replica {replica_vmid} already exists on {target_node}")
-                    continue
+                # Register template in global registry if not exists
+                register_template(template_vmid, source_node)
                 
-                # Create replica
-                console.print(f"[cyan]Синхронизация шаблона {template_vmid} на ноду {target_node}...[/cyan]")
+                if _replicas_recorded(template_info['configs'][0], source_node, nodes, node_templates):
+                    logger.debug("Template %s replicas recorded in stand cover all nodes", template_vmid)
+                    continue
                 
-                new_replica_vmid = ensure_template_on_node(
-                    prox, template_vmid, source_node, target_node
-                )
+                # Registry replicas of this template, read once for all target nodes
+                replicas = (get_template_registry().get(str(template_vmid)) or {}).get('replicas') or {}
                 
+                # Collect target nodes that still need a replica
+                for target_node in nodes:
+                    if target_node == source_node:
+                        continue
+                    
+                    # Check if replica already exists in registry and is valid
+                    replica_vmid = replicas.get(target_node)
+                    if replica_vmid:
+                        replica_vmid = int(replica_vmid)
+                    
+                    if replica_vmid and _replica_present(prox, node_templates, target_node, replica_vmid):
+                        logger.debug("Template %s replica %s already exists on %s", template_vmid, replica_vmid, target_node)
+                        continue
+                    
+                    pending.append((template_vmid, source_node, target_node))
+            
+            for template_vmid, target_node, new_replica_vmid in _create_replicas(prox, pending):
                 if new_replica_vmid:
                     updated = True
                     # Update stand config with replica info for backward compatibility
-                    _update_stand_replicas(stand, template_vmid, target_node, new_replica_vmid)
+                    _set_replica(templates[template_vmid]['configs'], target_node, new_replica_vmid)
                     console.print(f"[green]Шаблон {template_vmid} синхронизирован на {target_node} (VMID: {new_replica_vmid})[/green]")
                 else:
                     console.print(f"[red]Ошибка синхронизации шаблона {template_vmid} на {target_node}[/red]")
         
-        logger.info(f"Template synchronization {'completed with updates' if updated else 'completed - no changes needed'}")
+        logger.info("Template synchronization %s", 'completed with updates' if updated else 'completed - no changes needed')
         return updated
 
 
+def _create_replicas(prox, pending: List[Tuple[int, str, str]]) -> Iterator[Tuple[int, str, Optional[int]]]:
+    """
+    Create template replicas concurrently.
+    
+    ensure_template_on_node serializes clones per source node, so only
+    clones from different nodes and the migrations to targets overlap.
+    
+    Args:
+        prox: Proxmox API connection
+        pending: (template_vmid, source_node, target_node) tuples to replicate
+        
+    Yields:
+        (template_vmid, target_node, replica_vmid or None) as each one finishes
+    """
+    if not pending:
+        return
+    
+    # Workers record replicas in the caller's registry batch, if any
+    ensure_replica = in_registry_batch(ensure_template_on_node)
+    
+    with ThreadPoolExecutor(max_workers=min(shared.MAX_WORKERS, len(pending))) as executor:
+        futures = {}
+        for template_vmid, source_node, target_node in pending:
+            console.print(f"[cyan]Синхронизация шаблона {template_vmid} на ноду {target_node}...[/cyan]")
+            future = executor.submit(ensure_replica, prox, template_vmid, source_node, target_node)
+            futures[future] = (template_vmid, target_node)
+        
+        for future in as_completed(futures):
+            template_vmid, target_node = futures[future]
+            try:
+                replica_vmid = future.result()
+            except Exception as e:
+                log_error(logger, e, f"Sync template {template_vmid} -> {target_node}")
+                replica_vmid = None
+            yield template_vmid, target_node, replica_vmid
+
+
+def _replicas_recorded(machine: Dict[str, Any], source_node: str, nodes: List[str],
+                       node_templates: Dict[str, Optional[Set[int]]]) -> bool:
+    """
+    Check whether a machine's recorded replicas cover every target node.
+    
+    Args:
+        machine: Machine configuration dictionary
+        source_node: Node holding the original template
+        nodes: List of all available nodes
+        node_templates: Template VMIDs per node from _get_node_templates
+        
+    Returns:
+        True if each target node has a recorded replica present in its listing
+    """
+    replicas = machine.get('replicas') or {}
+    for node in nodes:
+        if node == source_node:
+            continue
+        present = node_templates.get(node)
+        replica_vmid = replicas.get(node)
+        if present is None or replica_vmid is None or int(replica_vmid) not in present:
+            return False
+    return True
+
+
 def _update_stand_replicas(stand: Dict[str, Any], template_vmid: int, 
                           target_node: str, replica_vmid: int) -> None:
     """
@@ -154,12 +224,22 @@ def _update_stand_replicas(stand: Dict[str, Any], template_vmid: int,
         target_node: Node where replica exists
         replica_vmid: Replica VMID on target node
     """
-    for machine in stand.get('machines', []):
-        if machine.get('template_vmid') == template_vmid:
-            if 'replicas' not in machine:
-                machine['replicas'] = {}
-            machine['replicas'][target_node] = replica_vmid
-            logger.debug(f"Updated stand config: machine {machine.get('name')} replica on {target_node} = {replica_vmid}")
+    machines = [m for m in stand.get('machines', []) if m.get('template_vmid') == template_vmid]
+    _set_replica(machines, target_node, replica_vmid)
+
+
+def _set_replica(machines: List[Dict[str, Any]], target_node: str, replica_vmid: int) -> None:
+    """
+    Record a replica VMID in the given machine configs.
+    
+    Args:
+        machines: Machine configuration dictionaries sharing one template
+        target_node: Node where replica exists
+        replica_vmid: Replica VMID on target node
+    """
+    for machine in machines:
+        machine.setdefault('replicas', {})[target_node] = replica_vmid
+        logger.debug("Updated stand config: machine %s replica on %s = %s", machine.get('name'), target_node, replica_vmid)
 
 
 def get_template_vmid_for_node(stand: Dict[str, Any], machine: Dict[str, Any], 
@@ -211,6 +291,40 @@ def get_template_vmid_for_node(stand: Dict[str, Any], machine: Dict[str, Any],
     return template_vmid
 
 
+def _get_node_templates(prox, nodes: List[str]) -> Dict[str, Optional[Set[int]]]:
+    """
+    Fetch the template VMIDs present on each node, querying nodes in parallel.
+    
+    Args:
+        prox: Proxmox API connection
+        nodes: Node names to query
+        
+    Returns:
+        Dictionary mapping node name to its set of template VMIDs,
+        or to None if the node could not be queried
+    """
+    def fetch(node: str) -> Optional[Set[int]]:
+        try:
+            return {vm['vmid'] for vm in prox.nodes(node).qemu.get() if vm.get('template') == 1}
+        except Exception as e:
+            logger.warning("Failed to list VMs on node %s: %s", node, e)
+            return None
+    
+    if not nodes:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(shared.MAX_WORKERS, len(nodes))) as executor:
+        return dict(zip(nodes, executor.map(fetch, nodes)))
+
+
+def _replica_present(prox, node_templates: Dict[str, Optional[Set[int]]],
+                     node: str, vmid: int) -> bool:
+    """Check a replica against prefetched node templates, querying the node if they are unknown."""
+    templates = node_templates.get(node)
+    if templates is None:
+        return verify_template_on_node(prox, node, vmid)
+    return vmid in templates
+
+
 def sync_all_templates_in_cluster(prox, nodes: List[str]) -> bool:
     """
     Sync all known templates from registry to all nodes.
@@ -230,28 +344,34 @@ def sync_all_templates_in_cluster(prox, nodes: List[str]) -> bool:
         return False
     
     updated = False
+    pending = []
+    node_templates = _get_node_templates(prox, nodes)
     
-    for template_vmid_str, template_data in registry.items():
-        template_vmid = int(template_vmid_str)
-        source_node = template_data.get('source_node')
-        
-        if not source_node:
-            logger.warning(f"Template {template_vmid} has no source node in registry")
-            continue
-        
-        for target_node in nodes:
-            if target_node == source_node:
-                continue
+    with registry_batch():
+        for template_vmid_str, template_data in registry.items():
+            template_vmid = int(template_vmid_str)
+            source_node = template_data.get('source_node')
             
-            replica_vmid = get_replica_vmid(template_vmid, target_node)
-            
-            if replica_vmid and verify_template_on_node(prox, target_node, replica_vmid):
+            if not source_node:
+                logger.warning("Template %s has no source node in registry", template_vmid)
                 continue
             
-            console.print(f"[cyan]Синхронизация шаблона {template_vmid} на {target_node}...[/cyan]")
-            
-            new_replica = ensure_template_on_node(prox, template_vmid, source_node, target_node)
+            replicas = template_data.get('replicas') or {}
             
+            for target_node in nodes:
+                if target_node == source_node:
+                    continue
+                
+                replica_vmid = replicas.get(target_node)
+                if replica_vmid:
+                    replica_vmid = int(replica_vmid)
+                
+                if replica_vmid and _replica_present(prox, node_templates, target_node, replica_vmid):
+                    continue
+                
+                pending.append((template_vmid, source_node, target_node))
+        
+        for template_vmid, target_node, new_replica in _create_replicas(prox, pending):
             if new_replica:
                 updated = True
                 console.print(f"[green]Шаблон {template_vmid} -> {target_node} (VMID: {new_replica})[/green]")
@@ -4,12 +4,87 @@ Tasks module for Lazy Teacher.
 Provides unified task waiting functionality.
 """
 
+import random
+import threading
 import time
-import logging
+import weakref
+from typing import Any, Callable, Dict
 from .logger import get_logger, log_error, OperationTimer
 
 logger = get_logger(__name__)
 
+# Task polling starts fast and backs off up to check_interval
+POLL_INITIAL_INTERVAL = 0.2
+POLL_BACKOFF_FACTOR = 1.5
+# Random extra fraction of each delay, so parallel waiters do not poll in lockstep
+POLL_JITTER = 0.1
+
+# With several waiters on one node, task statuses come from one shared task
+# list no older than this many seconds instead of one request per task
+TASK_LIST_MAX_AGE = 1.0
+TASK_LIST_LIMIT = 200
+
+
+class _NodeTaskPoller:
+    """Shares task status lookups between threads waiting on the same node."""
+
+    def __init__(self, tasks_resource):
+        self._tasks = tasks_resource
+        self._lock = threading.Lock()
+        self._waiters = 0
+        self._fetched_at = 0.0
+        self._entries: Dict[str, Dict[str, Any]] = {}
+
+    def register(self) -> None:
+        with self._lock:
+            self._waiters += 1
+
+    def unregister(self) -> None:
+        with self._lock:
+            self._waiters -= 1
+
+    def status(self, task_id: str, fetch_one: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Return the status of a task in the form of tasks/{upid}/status.
+
+        A single waiter queries its task directly. Concurrent waiters share
+        one node task list, refreshed at most every TASK_LIST_MAX_AGE seconds;
+        a task missing from that list is queried directly.
+        """
+        with self._lock:
+            if self._waiters > 1:
+                now = time.monotonic()
+                if now - self._fetched_at >= TASK_LIST_MAX_AGE:
+                    try:
+                        entries = self._tasks.get(source='all', limit=TASK_LIST_LIMIT)
+                        self._entries = {entry['upid']: entry for entry in entries}
+                    except Exception as e:
+                        logger.debug("Task list on node unavailable, polling tasks directly: %s", e)
+                        self._entries = {}
+                    self._fetched_at = now
+                entry = self._entries.get(task_id)
+                if entry is not None:
+                    if 'endtime' not in entry:
+                        return {'status': 'running'}
+                    return {'status': 'stopped', 'exitstatus': entry.get('status', '')}
+        return fetch_one()
+
+
+# Pollers per Proxmox connection and node, dropped together with the connection
+_pollers = weakref.WeakKeyDictionary()
+_pollers_lock = threading.Lock()
+
+
+def _get_node_poller(proxmox, node: str) -> _NodeTaskPoller:
+    """Get the shared task poller of a node."""
+    with _pollers_lock:
+        node_pollers = _pollers.setdefault(proxmox, {})
+        poller = node_pollers.get(node)
+        if poller is None:
+            poller = node_pollers[node] = _NodeTaskPoller(proxmox.nodes(node).tasks)
+        return poller
+
+
 def wait_for_task(
     proxmox,
     node: str,
@@ -28,7 +103,10 @@ def wait_for_task(
         task_id: Task identifier
         task_type: Type of task for logging ("clone", "migration", "template", etc.)
         timeout: Maximum time to wait in seconds
-        check_interval: Time between status checks in seconds
+        check_interval: Maximum time between status checks in seconds.
+            Polling starts at POLL_INITIAL_INTERVAL and grows by
+            POLL_BACKOFF_FACTOR up to this value, plus up to POLL_JITTER
+            of random extra delay.
         raise_exceptions: If True, raises exceptions on failure. If False, returns False.
 
     Returns:
@@ -42,38 +120,47 @@ def wait_for_task(
 
     with OperationTimer(logger, operation):
         start_time = time.time()
-
-        while time.time() - start_time < timeout:
-            try:
-                status = proxmox.nodes(node).tasks(task_id).status.get()
-
-                if status['status'] == 'stopped':
-                    exit_status = status.get('exitstatus', '')
-                    if exit_status.startswith('OK'):
-                        logger.info(f"{task_type.title()} task completed successfully", extra={
-                            'task_id': task_id,
-                            'node': node,
-                            'duration': time.time()-start_time
-                        })
-                        return True
-                    else:
-                        error_msg = f"{task_type.title()} task failed: {exit_status}"
-                        logger.error(error_msg, extra={
-                            'task_id': task_id,
-                            'node': node
-                        })
-                        if raise_exceptions:
-                            raise Exception(error_msg)
-                        return False
-
-            except Exception as e:
-                error_msg = f"Error checking {task_type} task status: {e}"
-                log_error(logger, e, f"Check {task_type} task status (task_id={task_id}, node={node})")
-                if raise_exceptions:
-                    raise Exception(error_msg) from e
-                return False
-
-            time.sleep(check_interval)
+        delay = min(POLL_INITIAL_INTERVAL, check_interval)
+        # Resolve the resource chain once, not on every poll
+        get_status = proxmox.nodes(node).tasks(task_id).status.get
+        poller = _get_node_poller(proxmox, node)
+        poller.register()
+
+        try:
+            while time.time() - start_time < timeout:
+                try:
+                    status = poller.status(task_id, get_status)
+
+                    if status['status'] == 'stopped':
+                        exit_status = status.get('exitstatus', '')
+                        if exit_status.startswith('OK'):
+                            logger.info(f"{task_type.title()} task completed successfully", extra={
+                                'task_id': task_id,
+                                'node': node,
+                                'duration': time.time()-start_time
+                            })
+                            return True
+                        else:
+                            error_msg = f"{task_type.title()} task failed: {exit_status}"
+                            logger.error(error_msg, extra={
+                                'task_id': task_id,
+                                'node': node
+                            })
+                            if raise_exceptions:
+                                raise Exception(error_msg)
+                            return False
+
+                except Exception as e:
+                    error_msg = f"Error checking {task_type} task status: {e}"
+                    log_error(logger, e, f"Check {task_type} task status (task_id={task_id}, node={node})")
+                    if raise_exceptions:
+                        raise Exception(error_msg) from e
+                    return False
+
+                time.sleep(delay * (1 + random.uniform(0, POLL_JITTER)))
+                delay = min(check_interval, delay * POLL_BACKOFF_FACTOR)
+        finally:
+            poller.unregister()
 
         timeout_msg = f"Timeout waiting for {task_type} task to complete"
         logger.error(timeout_msg, extra={
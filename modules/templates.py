@@ -5,17 +5,64 @@ Provides centralized template management across Proxmox nodes.
 Stores template replica mappings in config/templates.yaml
 """
 
+import copy
+import random
+import threading
+import time
+import weakref
+from contextlib import contextmanager
 import yaml
-from pathlib import Path
-from typing import Dict, Optional, Any
-import logging
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 from . import shared
+from .tasks import wait_for_clone_task, wait_for_template_task, wait_for_migration_task
 from .logger import get_logger, log_operation, log_error, OperationTimer
 
 logger = get_logger(__name__)
 
 TEMPLATES_FILE = shared.CONFIG_DIR / 'templates.yaml'
 
+# (mtime_ns, registry) from the last load or save of TEMPLATES_FILE
+_registry_cache: Optional[Tuple[int, Dict[str, Any]]] = None
+
+# registry_batch() the current thread works in, see _RegistryBatch
+_batch_local = threading.local()
+
+# Serializes read-modify-write cycles of templates.yaml between sync threads
+_registry_lock = threading.Lock()
+
+# Held from nextid.get() until clone.post() has claimed the new VMID
+_vmid_lock = threading.Lock()
+
+# Per source node: serializes clone and template conversion on that node
+_source_locks: Dict[str, threading.Lock] = {}
+
+# VM listings per connection: {node: (fetched_at, vms, template vmids)}, reused for NODE_VMS_TTL seconds
+NODE_VMS_TTL = 10.0
+_node_vms_cache = weakref.WeakKeyDictionary()
+_node_vms_lock = threading.Lock()
+
+# Error texts of Proxmox config/storage lock timeouts caused by concurrent operations
+LOCK_TIMEOUT_MARKERS = ("got timeout", "cfs-lock")
+LOCK_RETRY_ATTEMPTS = 4
+
+
+class _RegistryBatch:
+    """Registry writes deferred by one registry_batch() block."""
+
+    def __init__(self):
+        self.depth = 0
+        self.pending: Optional[Dict[str, Any]] = None
+
+
+def _current_batch() -> Optional[_RegistryBatch]:
+    """Get the registry batch of the current thread."""
+    return getattr(_batch_local, 'batch', None)
+
+
+def _source_lock(node: str) -> threading.Lock:
+    """Get the clone lock of a source node."""
+    return _source_locks.setdefault(node, threading.Lock())
+
 
 def get_template_registry() -> Dict[str, Any]:
     """
@@ -32,16 +79,31 @@ def get_template_registry() -> Dict[str, Any]:
                 }
             }
         }
+        
+        The file is parsed once per change of its mtime; callers get a copy
+        they are free to modify.
     """
-    if not TEMPLATES_FILE.exists():
-        logger.debug(f"Templates file {TEMPLATES_FILE} not found, returning empty registry")
+    global _registry_cache
+    
+    batch = _current_batch()
+    if batch is not None and batch.pending is not None:
+        return copy.deepcopy(batch.pending)
+    
+    try:
+        mtime = TEMPLATES_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        logger.debug("Templates file %s not found, returning empty registry", TEMPLATES_FILE)
         return {}
     
+    if _registry_cache is not None and _registry_cache[0] == mtime:
+        return copy.deepcopy(_registry_cache[1])
+    
     try:
-        with open(TEMPLATES_FILE, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f) or {}
-        logger.debug(f"Loaded template registry with {len(data)} templates")
-        return data
+        with open(TEMPLATES_FILE, 'rb') as f:
+            data = yaml.load(f, Loader=shared.YAML_LOADER) or {}
+        _registry_cache = (mtime, data)
+        logger.debug("Loaded template registry with %s templates", len(data))
+        return copy.deepcopy(data)
     except Exception as e:
         log_error(logger, e, "Load template registry", file=str(TEMPLATES_FILE))
         return {}
@@ -56,17 +118,79 @@ def save_template_registry(registry: Dict[str, Any]) -> bool:
         
     Returns:
         True if saved successfully, False otherwise
+        
+    Inside registry_batch() the registry is only kept in memory and
+    written once when the batch ends.
     """
+    global _registry_cache
+    
+    batch = _current_batch()
+    if batch is not None:
+        batch.pending = copy.deepcopy(registry)
+        return True
+    
+    _registry_cache = None
     try:
         with open(TEMPLATES_FILE, 'w', encoding='utf-8') as f:
             yaml.safe_dump(registry, f, default_flow_style=False, allow_unicode=True)
-        logger.debug(f"Saved template registry with {len(registry)} templates")
+        _registry_cache = (TEMPLATES_FILE.stat().st_mtime_ns, copy.deepcopy(registry))
+        logger.debug("Saved template registry with %s templates", len(registry))
         return True
     except Exception as e:
         log_error(logger, e, "Save template registry", file=str(TEMPLATES_FILE))
         return False
 
 
+@contextmanager
+def registry_batch():
+    """
+    Defer template registry writes until the block exits.
+    
+    The batch belongs to the thread that opened it: reads inside the block
+    see the pending changes, other threads keep using the file. Worker
+    threads join the batch through in_registry_batch(). Batches may nest;
+    the registry is written once when the outermost one exits.
+    """
+    batch = _current_batch()
+    if batch is None:
+        batch = _batch_local.batch = _RegistryBatch()
+    batch.depth += 1
+    try:
+        yield
+    finally:
+        batch.depth -= 1
+        if not batch.depth:
+            _batch_local.batch = None
+            if batch.pending is not None:
+                with _registry_lock:
+                    save_template_registry(batch.pending)
+
+
+def in_registry_batch(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Bind func to the registry batch of the calling thread.
+    
+    Args:
+        func: Function that will run in another thread, e.g. a pool worker
+        
+    Returns:
+        Wrapper that runs func inside the caller's batch, or func itself
+        when the caller is not in a batch
+    """
+    batch = _current_batch()
+    if batch is None:
+        return func
+    
+    def run(*args, **kwargs):
+        _batch_local.batch = batch
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _batch_local.batch = None
+    
+    return run
+
+
 def get_replica_vmid(original_vmid: int, target_node: str) -> Optional[int]:
     """
     Get replica VMID for a template on a specific node.
@@ -85,7 +209,7 @@ def get_replica_vmid(original_vmid: int, target_node: str) -> Optional[int]:
         replicas = registry[template_key].get('replicas', {})
         replica_vmid = replicas.get(target_node)
         if replica_vmid:
-            logger.debug(f"Found replica {replica_vmid} for template {original_vmid} on {target_node}")
+            logger.debug("Found replica %s for template %s on %s", replica_vmid, original_vmid, target_node)
             return int(replica_vmid)
     
     return None
@@ -121,19 +245,20 @@ def register_template(original_vmid: int, source_node: str) -> bool:
     Returns:
         True if registered successfully
     """
-    registry = get_template_registry()
-    template_key = str(original_vmid)
-    
-    if template_key not in registry:
-        registry[template_key] = {
-            'source_node': source_node,
-            'replicas': {}
-        }
-    else:
-        # Update source node if different
-        registry[template_key]['source_node'] = source_node
-    
-    return save_template_registry(registry)
+    with _registry_lock:
+        registry = get_template_registry()
+        template_key = str(original_vmid)
+        
+        if template_key not in registry:
+            registry[template_key] = {
+                'source_node': source_node,
+                'replicas': {}
+            }
+        else:
+            # Update source node if different
+            registry[template_key]['source_node'] = source_node
+        
+        return save_template_registry(registry)
 
 
 def register_replica(original_vmid: int, source_node: str, 
@@ -150,26 +275,28 @@ def register_replica(original_vmid: int, source_node: str,
     Returns:
         True if registered successfully
     """
-    registry = get_template_registry()
-    template_key = str(original_vmid)
-    
-    if template_key not in registry:
-        registry[template_key] = {
-            'source_node': source_node,
-            'replicas': {}
-        }
-    else:
-        # Update source node
-        registry[template_key]['source_node'] = source_node
-    
-    # Register replica
-    if 'replicas' not in registry[template_key]:
-        registry[template_key]['replicas'] = {}
-    
-    registry[template_key]['replicas'][target_node] = replica_vmid
-    
-    logger.info(f"Registered replica: template {original_vmid} -> {replica_vmid} on {target_node}")
-    return save_template_registry(registry)
+    with _registry_lock:
+        registry = get_template_registry()
+        template_key = str(original_vmid)
+        
+        if template_key not in registry:
+            registry[template_key] = {
+                'source_node': source_node,
+                'replicas': {}
+            }
+        else:
+            # Update source node
+            registry[template_key]['source_node'] = source_node
+        
+        # Register replica
+        if 'replicas' not in registry[template_key]:
+            registry[template_key]['replicas'] = {}
+        
+        registry[template_key]['replicas'][target_node] = replica_vmid
+        _forget_node_vms(target_node)
+        
+        logger.info("Registered replica: template %s -> %s on %s", original_vmid, replica_vmid, target_node)
+        return save_template_registry(registry)
 
 
 def remove_replica(original_vmid: int, target_node: str) -> bool:
@@ -183,16 +310,18 @@ def remove_replica(original_vmid: int, target_node: str) -> bool:
     Returns:
         True if removed successfully
     """
-    registry = get_template_registry()
-    template_key = str(original_vmid)
-    
-    if template_key in registry and 'replicas' in registry[template_key]:
-        if target_node in registry[template_key]['replicas']:
-            del registry[template_key]['replicas'][target_node]
-            logger.info(f"Removed replica for template {original_vmid} on {target_node}")
-            return save_template_registry(registry)
-    
-    return False
+    with _registry_lock:
+        registry = get_template_registry()
+        template_key = str(original_vmid)
+        
+        if template_key in registry and 'replicas' in registry[template_key]:
+            if target_node in registry[template_key]['replicas']:
+                del registry[template_key]['replicas'][target_node]
+                _forget_node_vms(target_node)
+                logger.info("Removed replica for template %s on %s", original_vmid, target_node)
+                return save_template_registry(registry)
+        
+        return False
 
 
 def get_all_nodes_with_template(original_vmid: int) -> list:
@@ -223,6 +352,37 @@ def get_all_nodes_with_template(original_vmid: int) -> list:
     return nodes
 
 
+def _get_node_vms(prox, node: str) -> Tuple[List[Dict[str, Any]], Set[int]]:
+    """
+    Get VMs of a node and the VMIDs of its templates, cached for NODE_VMS_TTL seconds.
+    
+    Args:
+        prox: Proxmox API connection
+        node: Node name
+        
+    Returns:
+        Tuple of the node's VM list and the set of template VMIDs in it
+    """
+    now = time.monotonic()
+    with _node_vms_lock:
+        cached = _node_vms_cache.get(prox, {}).get(node)
+    if cached is not None and now - cached[0] < NODE_VMS_TTL:
+        return cached[1], cached[2]
+    
+    vms = prox.nodes(node).qemu.get()
+    template_vmids = {vm['vmid'] for vm in vms if vm.get('template') == 1}
+    with _node_vms_lock:
+        _node_vms_cache.setdefault(prox, {})[node] = (now, vms, template_vmids)
+    return vms, template_vmids
+
+
+def _forget_node_vms(node: str) -> None:
+    """Drop cached VM listings of a node after its templates changed."""
+    with _node_vms_lock:
+        for node_vms in _node_vms_cache.values():
+            node_vms.pop(node, None)
+
+
 def verify_template_on_node(prox, node: str, vmid: int) -> bool:
     """
     Verify if template exists and is actually a template on the specified node.
@@ -236,19 +396,74 @@ def verify_template_on_node(prox, node: str, vmid: int) -> bool:
         True if template exists and is valid, False otherwise
     """
     try:
-        vms_on_node = prox.nodes(node).qemu.get()
-        template_present = any(
-            vm['vmid'] == vmid and vm.get('template') == 1
-            for vm in vms_on_node
-        )
+        _, template_vmids = _get_node_vms(prox, node)
+        template_present = vmid in template_vmids
         if template_present:
-            logger.debug(f"Template {vmid} verified on node {node}")
+            logger.debug("Template %s verified on node %s", vmid, node)
         return template_present
     except Exception as e:
-        logger.warning(f"Failed to verify template {vmid} on node {node}: {e}")
+        logger.warning("Failed to verify template %s on node %s: %s", vmid, node, e)
+        return False
+
+
+def _find_template_by_name(prox, node: str, name: str) -> Optional[int]:
+    """
+    Find a template with the given name on a node.
+    
+    Args:
+        prox: Proxmox API connection
+        node: Node name
+        name: Template name to look for
+        
+    Returns:
+        VMID of the template, or None if there is none or the node cannot be queried
+    """
+    try:
+        vms, _ = _get_node_vms(prox, node)
+        for vm in vms:
+            if vm.get('template') == 1 and vm.get('name') == name:
+                return int(vm['vmid'])
+    except Exception as e:
+        logger.warning("Failed to list templates on node %s: %s", node, e)
+    return None
+
+
+def _is_lock_timeout(error: Exception) -> bool:
+    """Check whether an API error is a Proxmox lock timeout."""
+    return any(marker in str(error) for marker in LOCK_TIMEOUT_MARKERS)
+
+
+def _vm_exists(node_resource, vmid: int) -> bool:
+    """Check whether a VM exists on a node (bound node resource)."""
+    try:
+        node_resource.qemu(vmid).status.current.get()
+        return True
+    except Exception:
         return False
 
 
+def _retry_on_lock_timeout(action: Callable[[], Any], description: str) -> Any:
+    """
+    Run an API request, retrying it with backoff while it fails on a Proxmox lock timeout.
+    
+    Args:
+        action: Request to send
+        description: Step description for logging
+        
+    Returns:
+        Result of the request
+    """
+    for attempt in range(LOCK_RETRY_ATTEMPTS):
+        try:
+            return action()
+        except Exception as e:
+            if attempt + 1 == LOCK_RETRY_ATTEMPTS or not _is_lock_timeout(e):
+                raise
+            delay = 2 ** attempt + random.random()
+            logger.warning("%s hit a lock timeout, retrying in %.1fs: %s", description, delay, e)
+            time.sleep(delay)
+
+
 def ensure_template_on_node(prox, original_vmid: int, source_node: str, 
                            target_node: str) -> Optional[int]:
     """
@@ -264,47 +479,67 @@ def ensure_template_on_node(prox, original_vmid: int, source_node: str,
     Returns:
         Replica VMID on target node, or None if failed
     """
-    from .tasks import wait_for_clone_task, wait_for_template_task, wait_for_migration_task
-    
     # Check registry first
     replica_vmid = get_replica_vmid(original_vmid, target_node)
     
     if replica_vmid:
         # Verify it actually exists
         if verify_template_on_node(prox, target_node, replica_vmid):
-            logger.debug(f"Template {original_vmid} replica {replica_vmid} exists on {target_node}")
+            logger.debug("Template %s replica %s exists on %s", original_vmid, replica_vmid, target_node)
             return replica_vmid
         else:
             # Remove invalid entry
             remove_replica(original_vmid, target_node)
-            logger.warning(f"Removed invalid replica entry for {original_vmid} on {target_node}")
+            logger.warning("Removed invalid replica entry for %s on %s", original_vmid, target_node)
+    
+    # Reuse a replica left on the node by an earlier sync but missing from the registry
+    safe_name = f"tpl-{original_vmid}-{target_node}"
+    existing_vmid = _find_template_by_name(prox, target_node, safe_name)
+    if existing_vmid:
+        register_replica(original_vmid, source_node, target_node, existing_vmid)
+        logger.info("Reusing template %s (%s) on %s", existing_vmid, safe_name, target_node)
+        return existing_vmid
     
     # Need to create replica
     with OperationTimer(logger, f"Create template replica {original_vmid} -> {target_node}"):
         try:
-            # Generate new VMID for clone
-            clone_vmid = int(prox.cluster.nextid.get())
-            safe_name = f"tpl-{original_vmid}-{target_node}"
-            
-            logger.info(f"Creating template clone {clone_vmid} from {original_vmid} on {source_node}")
-            shared.console.print(f"[cyan]Создание реплики шаблона {original_vmid} на {target_node}...[/cyan]")
-            
-            # Create full clone
-            clone_task_id = prox.nodes(source_node).qemu(original_vmid).clone.post(
-                newid=clone_vmid,
-                name=safe_name,
-                full=1
-            )
+            source = prox.nodes(source_node)
             
-            # Wait for clone completion
-            wait_for_clone_task(prox, source_node, clone_task_id)
-            
-            # Convert to template
-            template_task_id = prox.nodes(source_node).qemu(clone_vmid).template.post()
-            wait_for_template_task(prox, source_node, template_task_id)
+            with _source_lock(source_node):
+                with _vmid_lock:
+                    # Generate new VMID for clone
+                    clone_vmid = int(prox.cluster.nextid.get())
+                    
+                    logger.info("Creating template clone %s from %s on %s", clone_vmid, original_vmid, source_node)
+                    shared.console.print(f"[cyan]Создание реплики шаблона {original_vmid} на {target_node}...[/cyan]")
+                    
+                    # Create full clone; a request rejected on a lock created nothing
+                    # and is retried with the same VMID
+                    clone_task_id = _retry_on_lock_timeout(
+                        lambda: source.qemu(original_vmid).clone.post(
+                            newid=clone_vmid,
+                            name=safe_name,
+                            full=1
+                        ),
+                        f"Clone of template {original_vmid}"
+                    )
+                
+                # Wait for clone completion. The clone exists once its task has
+                # started, so a wait that times out keeps it instead of cloning again.
+                try:
+                    wait_for_clone_task(prox, source_node, clone_task_id)
+                except TimeoutError as e:
+                    if not _vm_exists(source, clone_vmid):
+                        raise
+                    logger.warning("Waiting for clone %s timed out, using the existing VM: %s", clone_vmid, e)
+                
+                # Convert to template
+                clone = source.qemu(clone_vmid)
+                template_task_id = clone.template.post()
+                wait_for_template_task(prox, source_node, template_task_id)
             
             # Migrate to target node
-            migrate_result = prox.nodes(source_node).qemu(clone_vmid).migrate.post(
+            migrate_result = clone.migrate.post(
                 target=target_node,
                 online=0
             )
@@ -324,7 +559,7 @@ def ensure_template_on_node(prox, original_vmid: int, source_node: str,
                                 target_node=target_node)
                     return clone_vmid
             
-            logger.error(f"Failed to migrate template {clone_vmid} to {target_node}")
+            logger.error("Failed to migrate template %s to %s", clone_vmid, target_node)
             return None
             
         except Exception as e:
@@ -5,13 +5,10 @@ Provides menu interfaces with ASCII-only interface.
 """
 
 import sys
-import glob
 import yaml
-from pathlib import Path
 from typing import Optional, Dict, List, Tuple, Any
-import logging
 from . import shared
-from .logger import get_logger, OperationTimer
+from .logger import get_logger
 
 logger = get_logger(__name__)
 
@@ -62,8 +59,7 @@ def select_from_list(items: List[str], title: str = "Выберите элеме
     print(f"\n{title}:")
     print("-" * 40)
     
-    for i, item in enumerate(items, 1):
-        print(f"  [{i}] {item}")
+    print("\n".join(f"  [{i}] {item}" for i, item in enumerate(items, 1)))
     print(f"  [0] Отмена")
     print()
     
@@ -136,23 +132,17 @@ def show_help(section: str) -> None:
     input("\nНажмите Enter для продолжения...")
 
 
-def select_from_config_files(pattern: str, suffix: str, title: str) -> Optional[Tuple[Any, str]]:
+def select_from_config_files(suffix: str, title: str) -> Optional[Tuple[Any, str]]:
     """Select from configuration files."""
-    files = glob.glob(pattern)
-    if not files:
+    items = shared.list_config_files(f"{suffix}.yaml")
+    if not items:
         print(f"[!] Нет файлов {suffix}.")
         return None
 
-    items = []
-    for file in files:
-        item_name = Path(file).stem.replace(suffix, '')
-        items.append((item_name, file))
-
     print(f"\n{title}:")
     print("-" * 40)
     
-    for i, (name, _) in enumerate(items, 1):
-        print(f"  [{i}] {name}")
+    print("\n".join(f"  [{i}] {name}" for i, (name, _) in enumerate(items, 1)))
     print(f"  [0] Отмена")
     print()
     
@@ -163,8 +153,8 @@ def select_from_config_files(pattern: str, suffix: str, title: str) -> Optional[
         idx = int(choice) - 1
         if 0 <= idx < len(items):
             name, file_path = items[idx]
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+            with open(file_path, 'rb') as f:
+                data = yaml.load(f, Loader=shared.YAML_LOADER)
             logger.info(f"Selected {suffix}: {name}")
             return data, file_path
         print("[!] Неверный выбор")
@@ -177,14 +167,12 @@ def select_from_config_files(pattern: str, suffix: str, title: str) -> Optional[
 
 def select_stand_config() -> Optional[Tuple[Any, str]]:
     """Select stand configuration file."""
-    pattern = str(shared.CONFIG_DIR / "*_stand.yaml")
-    return select_from_config_files(pattern, '_stand', "Выберите конфигурацию стенда")
+    return select_from_config_files('_stand', "Выберите конфигурацию стенда")
 
 
 def select_user_list() -> Optional[List[str]]:
     """Select user list file."""
-    pattern = str(shared.CONFIG_DIR / "*_list.yaml")
-    result = select_from_config_files(pattern, '_list', "Выберите список пользователей")
+    result = select_from_config_files('_list', "Выберите список пользователей")
     return result[0].get('users', []) if result else None
 
 
@@ -240,8 +228,9 @@ def main_menu():
 
 def create_stands_menu():
     """Menu for creating stands."""
-    from .connections import get_proxmox_connection
+    from .connections import get_proxmox_connection, get_node_names
     from .groups import create_group, generate_group_name, group_exists
+    from .stands import load_stand
     from .deploy_stand_local import deploy_stand_local
     from .deploy_stand_distributed import deploy_stand_distributed
     
@@ -294,9 +283,11 @@ def create_stands_menu():
                 stand_file = f"{stand_name}_stand.yaml"
             elif 0 <= idx < len(stand_configs):
                 stand_file = f"{stand_configs[idx]}_stand.yaml"
-                stand_path = shared.CONFIG_DIR / stand_file
-                with open(stand_path, 'r', encoding='utf-8') as f:
-                    stand = yaml.safe_load(f)
+                stand = load_stand(stand_configs[idx])
+                if stand is None:
+                    print(f"[!] Не удалось загрузить конфигурацию '{stand_configs[idx]}'")
+                    input("\nНажмите Enter для продолжения...")
+                    return
             else:
                 print("[!] Неверный выбор")
                 input("\nНажмите Enter для продолжения...")
@@ -338,8 +329,8 @@ def create_stands_menu():
             elif 0 <= idx < len(user_lists):
                 user_list_file = f"{user_lists[idx]}_list.yaml"
                 user_list_path = shared.CONFIG_DIR / user_list_file
-                with open(user_list_path, 'r', encoding='utf-8') as f:
-                    data = yaml.safe_load(f)
+                with open(user_list_path, 'rb') as f:
+                    data = yaml.load(f, Loader=shared.YAML_LOADER)
                     users = data.get('users', [])
             else:
                 print("[!] Неверный выбор")
@@ -365,8 +356,7 @@ def create_stands_menu():
     # Step 5: Check cluster nodes
     try:
         prox = get_proxmox_connection()
-        nodes_data = prox.nodes.get()
-        nodes = [n['node'] for n in nodes_data]
+        nodes = get_node_names(prox)
     except Exception as e:
         print(f"[!] Ошибка получения списка нод: {e}")
         input("\nНажмите Enter для продолжения...")
@@ -414,16 +404,12 @@ def create_stands_menu():
 
 def _get_stand_config_choices() -> List[str]:
     """Get list of available stand configs."""
-    pattern = str(shared.CONFIG_DIR / "*_stand.yaml")
-    files = glob.glob(pattern)
-    return [Path(f).stem.replace('_stand', '') for f in files]
+    return [name for name, _ in shared.list_config_files('_stand.yaml')]
 
 
 def _get_user_list_choices() -> List[str]:
     """Get list of available user lists."""
-    pattern = str(shared.CONFIG_DIR / "*_list.yaml")
-    files = glob.glob(pattern)
-    return [Path(f).stem.replace('_list', '') for f in files]
+    return [name for name, _ in shared.list_config_files('_list.yaml')]
 
 
 def _enter_users_menu() -> List[str]:
@@ -496,7 +482,7 @@ def manage_stands_menu():
 
 def manage_group_menu(group_name: str):
     """Menu for managing a specific group."""
-    from .groups import get_group, get_group_users, delete_group, remove_user_from_group
+    from .groups import get_group
     from .connections import get_proxmox_connection
     
     group = get_group(group_name)
@@ -660,9 +646,9 @@ def _start_user_vms(prox, username: str):
             
             if vmid and node:
                 try:
-                    vm_status = prox.nodes(node).qemu(vmid).status.current.get()
-                    if vm_status.get('status') != 'running':
-                        prox.nodes(node).qemu(vmid).status.start.post()
+                    vm = prox.nodes(node).qemu(vmid)
+                    if vm.status.current.get().get('status') != 'running':
+                        vm.status.start.post()
                         print(f"  [+] VM {vmid} запущена")
                 except Exception as e:
                     logger.error(f"Error starting VM {vmid}: {e}")
@@ -673,6 +659,8 @@ def _start_user_vms(prox, username: str):
 
 def _reset_user_vms(prox, username: str):
     """Reset all VMs for a user to 'start' snapshot."""
+    from .stand_management import stop_vm_and_wait
+
     pool_name = username.split('@')[0]
     
     try:
@@ -685,17 +673,11 @@ def _reset_user_vms(prox, username: str):
             
             if vmid and node:
                 try:
-                    vm_status = prox.nodes(node).qemu(vmid).status.current.get()
-                    if vm_status.get('status') == 'running':
-                        prox.nodes(node).qemu(vmid).status.stop.post()
-                        import time
-                        for _ in range(30):
-                            status = prox.nodes(node).qemu(vmid).status.current.get()
-                            if status.get('status') == 'stopped':
-                                break
-                            time.sleep(1)
+                    vm = prox.nodes(node).qemu(vmid)
+                    if vm.status.current.get().get('status') == 'running':
+                        stop_vm_and_wait(prox, node, vm)
                     
-                    prox.nodes(node).qemu(vmid).snapshot('start').rollback.post()
+                    vm.snapshot('start').rollback.post()
                     print(f"  [+] VM {vmid} сброшена на 'start'")
                     
                 except Exception as e:
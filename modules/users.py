@@ -4,28 +4,28 @@ Users module for Lazy Teacher.
 Provides functions for managing user lists.
 """
 
-import glob
+import sys
 import yaml
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Tuple
 
 from . import shared
-from .logger import get_logger, log_operation, log_error, OperationTimer
+from .logger import get_logger, log_error, OperationTimer
 
 logger = get_logger(__name__)
 
+LIST_SUFFIX = '_list.yaml'
 
-def _get_user_list_files() -> List[tuple]:
+
+def get_user_list_files() -> List[Tuple[str, str]]:
     """Get list of user list files."""
-    pattern = str(shared.CONFIG_DIR / "*_list.yaml")
-    files = glob.glob(pattern)
-    return [(Path(f).stem.replace('_list', ''), f) for f in files]
+    return shared.list_config_files(LIST_SUFFIX)
 
 
 def display_user_lists() -> None:
     """Display all saved user lists."""
     with OperationTimer(logger, "Display user lists"):
-        user_lists = _get_user_list_files()
+        user_lists = get_user_list_files()
         
         if not user_lists:
             print("[!] Нет сохраненных списков пользователей.")
@@ -40,7 +40,7 @@ def display_user_lists() -> None:
         for i, (name, file_path) in enumerate(user_lists, 1):
             try:
                 with open(file_path, 'r', encoding='utf-8') as f:
-                    data = yaml.safe_load(f) or {}
+                    data = yaml.load(f, Loader=shared.YAML_LOADER) or {}
                 users = data.get('users', [])
                 print(f"{i:<5} {name:<25} {len(users):<15}")
             except Exception:
@@ -51,23 +51,33 @@ def display_user_lists() -> None:
 
 
 def input_users_manual() -> Optional[List[str]]:
-    """Input users manually."""
+    """
+    Input users manually.
+    
+    When stdin is not a terminal (e.g. a list is piped in), users are read
+    line by line without prompts up to the first empty line; the rest of the
+    stream is left for the following prompts.
+    """
     with OperationTimer(logger, "Input users manual"):
         users = []
-        
-        print("\nВвод пользователей (пустая строка для завершения):")
-        print("Формат: user1 или user1@pve")
-        print()
-        
-        while True:
-            user = input("Пользователь: ").strip()
-            if not user:
-                break
-            
-            if '@' not in user:
-                user = f"{user}@pve"
+        if sys.stdin.isatty():
+            print("\nВвод пользователей (пустая строка для завершения):")
+            print("Формат: user1 или user1@pve")
+            print()
             
-            users.append(user)
+            while True:
+                user = input("Пользователь: ").strip()
+                if not user:
+                    break
+                users.append(user)
+        else:
+            for line in iter(sys.stdin.readline, ''):
+                user = line.strip()
+                if not user:
+                    break
+                users.append(user)
+        
+        users = [user if '@' in user else f"{user}@pve" for user in users]
         
         if not users:
             print("[!] Список пуст.")
@@ -98,15 +108,9 @@ def import_users() -> Optional[List[str]]:
         
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            users = []
-            for line in lines:
-                user = line.strip()
-                if user and not user.startswith('#'):
-                    if '@' not in user:
-                        user = f"{user}@pve"
-                    users.append(user)
+                users = [user if '@' in user else f"{user}@pve"
+                         for user in (line.strip() for line in f)
+                         if user and not user.startswith('#')]
             
             if not users:
                 print("[!] Файл не содержит пользователей.")
@@ -138,12 +142,12 @@ def import_users() -> Optional[List[str]]:
 
 def save_user_list(name: str, users: List[str]) -> bool:
     """Save user list to file."""
-    file_path = shared.CONFIG_DIR / f"{name}_list.yaml"
+    file_path = shared.CONFIG_DIR / f"{name}{LIST_SUFFIX}"
     
     try:
-        data = {'users': users}
-        with open(file_path, 'w', encoding='utf-8') as f:
-            yaml.safe_dump(data, f, default_flow_style=False, allow_unicode=True)
+        payload = yaml.dump({'users': users}, Dumper=shared.YAML_DUMPER, default_flow_style=False,
+                            allow_unicode=True, encoding='utf-8')
+        shared.atomic_write_if_changed(file_path, payload)
         print(f"\n[+] Список '{name}' сохранен ({len(users)} пользователей)")
         logger.info(f"Saved user list: {name} ({len(users)} users)")
         return True
@@ -155,11 +159,11 @@ def save_user_list(name: str, users: List[str]) -> bool:
 
 def load_user_list(name: str) -> Optional[List[str]]:
     """Load user list from file."""
-    file_path = shared.CONFIG_DIR / f"{name}_list.yaml"
+    file_path = shared.CONFIG_DIR / f"{name}{LIST_SUFFIX}"
     
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f) or {}
+            data = yaml.load(f, Loader=shared.YAML_LOADER) or {}
         return data.get('users', [])
     except FileNotFoundError:
         logger.warning(f"User list {name} not found")
@@ -171,7 +175,7 @@ def load_user_list(name: str) -> Optional[List[str]]:
 
 def delete_user_list() -> None:
     """Delete a user list file."""
-    user_lists = _get_user_list_files()
+    user_lists = get_user_list_files()
     
     if not user_lists:
         print("[!] Нет сохраненных списков пользователей.")
@@ -208,7 +212,7 @@ def delete_user_list() -> None:
 
 def select_user_list() -> Optional[List[str]]:
     """Select a user list interactively."""
-    user_lists = _get_user_list_files()
+    user_lists = get_user_list_files()
     
     if not user_lists:
         print("[!] Нет сохраненных списков пользователей.")
@@ -220,7 +224,7 @@ def select_user_list() -> Optional[List[str]]:
     for i, (name, file_path) in enumerate(user_lists, 1):
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f) or {}
+                data = yaml.load(f, Loader=shared.YAML_LOADER) or {}
             users_count = len(data.get('users', []))
             print(f"  [{i}] {name} ({users_count} польз.)")
         except Exception: